@@ -0,0 +1,170 @@
+"""Simulated OpenAI-compatible chat completions server for offline benchmarks.
+
+Replies look like what the evaluator expects from vLLM (a "score" object,
+a "scores" object over every category, or "influential_categories"), after a
+latency drawn from a configurable distribution. A share of requests can fail
+with HTTP 503 or return malformed JSON to exercise retries and fallbacks.
+Usage:
+
+    python benchmarks/fake_openai.py --port 8000 --latency lognormal:0.2,0.5 --error-rate 0.01 --malformed-rate 0.05
+
+then point ``WolverineSettings.base_url`` at http://127.0.0.1:8000/v1.
+
+Latency specs: ``constant:S``, ``uniform:LO,HI``, ``exponential:MEAN`` and
+``lognormal:MEDIAN,SIGMA`` (seconds).
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from categories import STORY_EVALUATION_CATEGORIES  # noqa: E402
+
+
+def parse_latency(spec: str):
+    """Return a function drawing one latency in seconds from ``spec``."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "constant" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exponential" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) if values[0] > 0 else 0.0
+    raise ValueError(f"Invalid latency spec {spec!r}")
+
+
+class FakeBackend:
+    """Reply generator and request counters shared by the handler threads."""
+
+    def __init__(self, latency: str = "constant:0.05", error_rate: float = 0.0, malformed_rate: float = 0.0, seed: int = 0):
+        self._draw_latency = parse_latency(latency)
+        self._error_rate = error_rate
+        self._malformed_rate = malformed_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.malformed = 0
+
+    def reply(self, body: dict) -> tuple[int, dict, float]:
+        """Return (HTTP status, response body, latency) for one chat completion request."""
+        with self._lock:
+            self.requests += 1
+            latency = self._draw_latency(self._rng)
+            if self._rng.random() < self._error_rate:
+                self.errors += 1
+                return 503, {"error": {"message": "simulated overload", "type": "server_error"}}, latency
+            n = body.get("n") or 1
+            malformed = [self._rng.random() < self._malformed_rate for _ in range(n)]
+            self.malformed += sum(malformed)
+            text = " ".join(m.get("content") or "" for m in body.get("messages", []))
+            contents = [self._content(text, bad) for bad in malformed]
+        choices = [
+            {"index": i, "message": {"role": "assistant", "content": c}, "finish_reason": "stop"}
+            for i, c in enumerate(contents)
+        ]
+        prompt_tokens = len(text) // 4
+        completion_tokens = sum(len(c) for c in contents) // 4
+        return 200, {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": choices,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }, latency
+
+    def _content(self, text: str, malformed: bool) -> str:
+        # Called with the lock held, so the shared RNG is safe to use
+        if "influential_categories" in text:
+            reply = {"influential_categories": self._rng.sample(STORY_EVALUATION_CATEGORIES, 2)}
+        elif "'scores'" in text:
+            reply = {"scores": {cat: round(self._rng.uniform(0, 20), 1) for cat in STORY_EVALUATION_CATEGORIES}}
+        else:
+            reply = {"score": round(self._rng.uniform(0, 20), 1)}
+        content = json.dumps(reply)
+        # Malformed replies are cut off mid-object, like a generation that hit max_tokens
+        return content[: len(content) // 2] if malformed else content
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "errors": self.errors, "malformed": self.malformed}
+
+
+def make_server(backend: FakeBackend, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """HTTP server answering /v1/chat/completions and /v1/models from ``backend`` (port 0 picks a free port)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+            elif self.path.rstrip("/").endswith("/stats"):
+                self._send(200, backend.stats())
+            else:
+                self._send(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            status, reply, latency = backend.reply(body)
+            time.sleep(latency)
+            self._send(status, reply)
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        # The default backlog of 5 drops connections when the client opens many at once
+        request_queue_size = 1024
+
+    return Server((host, port), Handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulated OpenAI-compatible backend for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="0 picks a free port")
+    parser.add_argument("--latency", default="constant:0.05", help="Latency distribution (see module docstring)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of completions with truncated JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = make_server(FakeBackend(args.latency, args.error_rate, args.malformed_rate, args.seed), args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"[INFO] Fake OpenAI server listening on http://{host}:{port}/v1", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
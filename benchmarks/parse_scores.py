@@ -0,0 +1,124 @@
+"""Reply parser check and micro-benchmark.
+
+Every entry of parsing_corpus.jsonl is an evaluator reply as models actually
+produce them (fenced, wrapped in prose, truncated, with renamed or annotated
+keys) together with what the parser must return; a mismatch is reported and
+makes the script exit 1. Afterwards the time per parse_combined_response call
+is compared with the previous implementation (kept below), which
+substring-matched every category against every key. Usage:
+
+    python benchmarks/parse_scores.py [--repeat 2000]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+
+from categories import STORY_EVALUATION_CATEGORIES  # noqa: E402
+from parsing import clamp_score, parse_combined_response, parse_influential_categories, parse_response  # noqa: E402
+
+CORPUS_PATH = BENCHMARK_DIR / "parsing_corpus.jsonl"
+PARSERS = {
+    "score": parse_response,
+    "scores": parse_combined_response,
+    "analysis": parse_influential_categories,
+}
+
+
+######## Previous implementation ########
+_LEGACY_PAIR_PATTERN = re.compile(r'"([^"\n]+)"\s*:\s*"?(-?\d+(?:\.\d+)?)')
+
+
+def legacy_parse_combined_response(response: str) -> dict[str, float]:
+    cleaned_response = response.strip()
+    if cleaned_response.startswith("```json"):
+        cleaned_response = cleaned_response[7:]
+    if cleaned_response.startswith("```"):
+        cleaned_response = cleaned_response[3:]
+    if cleaned_response.endswith("```"):
+        cleaned_response = cleaned_response[:-3]
+    cleaned_response = cleaned_response.strip()
+
+    try:
+        payload = json.loads(cleaned_response)
+        scores = payload.get("scores", payload) if isinstance(payload, dict) else {}
+        if not isinstance(scores, dict):
+            scores = {}
+    except json.JSONDecodeError:
+        scores = dict(_LEGACY_PAIR_PATTERN.findall(cleaned_response))
+
+    results = {}
+    for category in STORY_EVALUATION_CATEGORIES:
+        score = scores.get(category)
+        if score is None:
+            for key, value in scores.items():
+                cleaned_key = key.replace(" (POSITIVE)", "").replace(" (NEGATIVE/PENALTY)", "").strip()
+                if category.lower() == cleaned_key.lower() or category.lower() in cleaned_key.lower() or cleaned_key.lower() in category.lower():
+                    score = value
+                    break
+        if score is None:
+            continue
+        try:
+            results[category] = clamp_score(float(score))
+        except (ValueError, TypeError):
+            continue
+    return results
+
+
+######## Corpus check ########
+def load_corpus(path: Path = CORPUS_PATH) -> list[dict]:
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def check_corpus(corpus: list[dict]) -> list[str]:
+    """Return a description of every corpus entry the parsers get wrong."""
+    failures = []
+    for number, entry in enumerate(corpus, 1):
+        got = PARSERS[entry["kind"]](entry["response"])
+        if got != entry["expected"]:
+            failures.append(f"#{number} {entry['kind']} ({entry['note']}): expected {entry['expected']!r}, got {got!r}")
+    return failures
+
+
+######## Micro-benchmark ########
+def time_per_call(parse, responses: list[str], repeat: int) -> float:
+    """Mean microseconds per call of ``parse`` over ``responses``, ``repeat`` passes."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for response in responses:
+            parse(response)
+    return (time.perf_counter() - start) / (repeat * len(responses)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the reply parsers against the corpus and time them.")
+    parser.add_argument("--repeat", type=int, default=2000, help="Passes over the replies per timing")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    failures = check_corpus(corpus)
+    for failure in failures:
+        print(f"[WARNING] {failure}")
+    print(f"[INFO] Corpus: {len(corpus) - len(failures)}/{len(corpus)} replies parsed as expected")
+
+    combined = [entry["response"] for entry in corpus if entry["kind"] == "scores"]
+    valid = [r for r in combined if r.lstrip().startswith("{") and r.rstrip().endswith("}")]
+    print(f"{'replies':>24} {'legacy us/call':>15} {'new us/call':>12} {'speedup':>8}")
+    for label, responses in (("all combined", combined), ("bare objects only", valid)):
+        legacy = time_per_call(legacy_parse_combined_response, responses, args.repeat)
+        new = time_per_call(parse_combined_response, responses, args.repeat)
+        print(f"{label:>24} {legacy:>15.1f} {new:>12.1f} {legacy / new:>7.1f}x")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Estimate the prefill that vLLM's automatic prefix caching saves for each prompt version.
+
+Every dataset story is rendered through all pipeline stages (creativity,
+scores, contextual, analysis) with placeholder scores, in the order the
+evaluator sends them. For each call, the tokens it shares as a prefix with an
+earlier call on the same story count as reusable, rounded down to whole KV
+cache blocks as vLLM only reuses full blocks. Usage:
+
+    python benchmarks/prefix_cache.py [--dataset dataset/data.csv] [--limit 200] [--tokenizer Qwen/Qwen2.5-7B-Instruct]
+
+Without --tokenizer, tokens are approximated by a word/punctuation split.
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from categories import STORY_EVALUATION_CATEGORIES  # noqa: E402
+from config import DATASET_PATH  # noqa: E402
+from dataset import IndexedCSVDataset  # noqa: E402
+from evaluation import EvaluationResult  # noqa: E402
+from prompts import PROMPT_SETS, ChatPrompt, PromptSet  # noqa: E402
+
+BLOCK_SIZE = 16
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]|\s+")
+
+
+def approximate_tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text)
+
+
+def load_tokenizer(name: str | None):
+    if name is None:
+        return approximate_tokenize
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    return lambda text: tokenizer.encode(text, add_special_tokens=False)
+
+
+def story_calls(prompts: PromptSet, story: str) -> list[ChatPrompt]:
+    """The prompts of one story in evaluation order, with fixed placeholder scores."""
+    results = {cat: EvaluationResult(cat, 10.0) for cat in STORY_EVALUATION_CATEGORIES}
+    return [
+        prompts.creativity(story),
+        prompts.scores(story),
+        prompts.contextual(story, results),
+        prompts.analysis(story, 10.0, 12.0, results),
+    ]
+
+
+def common_prefix(a: list, b: list) -> int:
+    n = min(len(a), len(b))
+    for i in range(n):
+        if a[i] != b[i]:
+            return i
+    return n
+
+
+def measure(prompts: PromptSet, stories: list[str], tokenize) -> dict:
+    total = reusable = 0
+    for story in stories:
+        seen: list[list] = []
+        for prompt in story_calls(prompts, story):
+            # The system message is rendered before the user message by the chat template
+            tokens = tokenize(prompt.system + "\n") + tokenize(prompt.user)
+            shared = max((common_prefix(tokens, earlier) for earlier in seen), default=0)
+            total += len(tokens)
+            reusable += shared // BLOCK_SIZE * BLOCK_SIZE
+            seen.append(tokens)
+    return {
+        "version": prompts.version,
+        "prompt_tokens": total,
+        "reusable_tokens": reusable,
+        "prefill_saved_pct": round(100 * reusable / total, 1) if total else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default=str(DATASET_PATH))
+    parser.add_argument("--limit", type=int, default=None, help="Only the first N stories")
+    parser.add_argument("--tokenizer", default=None, help="Hugging Face tokenizer name (needs transformers)")
+    args = parser.parse_args()
+
+    dataset = IndexedCSVDataset(args.dataset)
+    stories = [row.get("response", "") for _, row in dataset.iter_rows()][: args.limit]
+    tokenize = load_tokenizer(args.tokenizer)
+
+    print(f"{len(stories)} stories, 4 calls each, {BLOCK_SIZE}-token blocks")
+    print(f"{'version':>8} {'prompt tokens':>14} {'reusable':>10} {'prefill saved':>14}")
+    for prompts in PROMPT_SETS.values():
+        r = measure(prompts, stories, tokenize)
+        print(f"{r['version']:>8} {r['prompt_tokens']:>14} {r['reusable_tokens']:>10} {r['prefill_saved_pct']:>13}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Evaluator throughput benchmark against the simulated backend in fake_openai.py.
+
+For every combination of dataset size and story length a synthetic dataset is
+generated and evaluated in a fresh process (so caches, connection pools and
+peak memory do not carry over), either through the MCP tool
+``evaluate_full_dataset`` (async engine) or story by story through
+``StoryEvaluator.evaluate_story_full`` (sync client). Usage:
+
+    python benchmarks/throughput.py --sizes 100 1000 --story-words 300 1500 \\
+        --latency lognormal:0.2,0.5 --error-rate 0.01 --malformed-rate 0.05
+
+Reported per run: stories/sec, LLM calls per story, p50/p99 call latency as
+seen by the client (including retries), combined-reply fallbacks per story,
+backend errors / malformed replies served, and the peak RSS of the process.
+The response cache is disabled; results are written to a temporary directory.
+"""
+
+import argparse
+import asyncio
+import csv
+import dataclasses
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+RESULT_MARKER = "BENCHMARK_RESULT "
+_WORDS = (
+    "the a of and to in was she he they old river night light village stone wind door letter city sea "
+    "remembered walked whispered carried found lost quiet strange bright silver broken small endless "
+    "morning winter garden machine clock mirror forest signal ship road window voice dream shadow"
+).split()
+
+
+######## Synthetic data ########
+def synthetic_story(rng: random.Random, words: int) -> str:
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(6, 18))
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(length))
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+
+def write_dataset(path: Path, rows: int, story_words: int, seed: int = 0) -> Path:
+    """Write a dataset CSV (model, response) of ``rows`` stories of about ``story_words`` words."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["model", "response"])
+        for i in range(rows):
+            writer.writerow([f"model-{i % 3}", synthetic_story(rng, story_words)])
+    return path
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+
+######## One run (child process) ########
+def run_scenario(mode: str, dataset_path: str, base_url: str, work_dir: str, limit: int | None) -> dict:
+    """Evaluate ``dataset_path`` against ``base_url`` in this process and return the measurements."""
+    # Settings are read at import time, so point them at the fake backend before importing server
+    import config
+
+    config.WOLVERINE_SETTINGS = dataclasses.replace(
+        config.WOLVERINE_SETTINGS,
+        base_url=base_url,
+        endpoints=(),
+        cache_enabled=False,
+        result_store_path=str(Path(work_dir) / "result_store.sqlite"),
+    )
+    config.DATASET_PATH = Path(dataset_path)
+    config.RESULTS_DIR = Path(work_dir)
+
+    import server
+    from dataset import IndexedCSVDataset
+    from metrics import METRICS
+
+    latencies: list[float] = []
+    router = server.get_router()
+    create, acreate = router.create, router.acreate
+
+    def timed_create(**kwargs):
+        start = time.perf_counter()
+        try:
+            return create(**kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    async def timed_acreate(**kwargs):
+        start = time.perf_counter()
+        try:
+            return await acreate(**kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    router.create, router.acreate = timed_create, timed_acreate
+
+    start = time.perf_counter()
+    if mode == "dataset":
+        summary = asyncio.run(server.evaluate_full_dataset(output_filename="benchmark.csv", use_cache=False))
+        if "error" in summary:
+            raise RuntimeError(summary["error"])
+        stories = summary["entries_evaluated"]
+        stats = summary["evaluator"]
+    else:
+        evaluator = server.get_evaluator()
+        stories = 0
+        for _, row in IndexedCSVDataset(dataset_path).iter_rows():
+            if limit is not None and stories >= limit:
+                break
+            evaluator.evaluate_story_full(row.get("response", ""))
+            stories += 1
+        stats = evaluator.stats()
+    elapsed = time.perf_counter() - start
+
+    totals = METRICS.snapshot()["totals"]
+    # ru_maxrss is in KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "stories": stories,
+        "seconds": round(elapsed, 3),
+        "stories_per_sec": round(stories / elapsed, 3) if elapsed > 0 else None,
+        "calls": len(latencies),
+        "calls_per_story": round(len(latencies) / stories, 3) if stories else None,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "fallbacks_per_story": round(stats["fallback_events"] / stories, 3) if stories else None,
+        "unscored_categories": stats["unscored_categories"],
+        "retries": totals["retries"],
+        "parse_failures": totals["parse_failures"],
+        "prompt_tokens_per_story": round(totals["prompt_tokens"] / stories, 1) if stories else None,
+        "completion_tokens_per_story": round(totals["completion_tokens"] / stories, 1) if stories else None,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+
+def scenario_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="throughput.py scenario")
+    parser.add_argument("--mode", choices=("dataset", "sync"), required=True)
+    parser.add_argument("--dataset", required=True)
+    parser.add_argument("--base-url", required=True)
+    parser.add_argument("--work-dir", required=True)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+    result = run_scenario(args.mode, args.dataset, args.base_url, args.work_dir, args.limit)
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+
+
+######## Benchmark driver ########
+def run_in_subprocess(mode: str, dataset_path: Path, base_url: str, work_dir: Path, limit: int | None) -> dict:
+    command = [
+        sys.executable, __file__, "scenario",
+        "--mode", mode, "--dataset", str(dataset_path), "--base-url", base_url, "--work-dir", str(work_dir),
+    ]
+    if limit is not None:
+        command += ["--limit", str(limit)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    tail = "\n".join((completed.stdout + completed.stderr).splitlines()[-20:])
+    raise RuntimeError(f"{mode} run on {dataset_path.name} failed (exit {completed.returncode}):\n{tail}")
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "scenario":
+        scenario_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description="Evaluator throughput against a simulated OpenAI-compatible backend.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200], help="Stories per synthetic dataset")
+    parser.add_argument("--story-words", type=int, nargs="+", default=[300, 1500], help="Words per story")
+    parser.add_argument("--modes", nargs="+", choices=("dataset", "sync"), default=["dataset", "sync"])
+    parser.add_argument("--sync-limit", type=int, default=20, help="Stories evaluated by the sequential sync run")
+    parser.add_argument("--latency", default="lognormal:0.05,0.5", help="Backend latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Also write every result to this JSON file")
+    args = parser.parse_args()
+
+    from fake_openai import FakeBackend, make_server
+
+    backend = FakeBackend(args.latency, args.error_rate, args.malformed_rate, args.seed)
+    fake_server = make_server(backend)
+    threading.Thread(target=fake_server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{fake_server.server_address[1]}/v1"
+    print(
+        f"[INFO] Backend {base_url}: latency {args.latency}, "
+        f"error rate {args.error_rate}, malformed rate {args.malformed_rate}"
+    )
+
+    results = []
+    header = (
+        f"{'mode':>8} {'stories':>7} {'words':>6} {'stories/s':>10} {'calls/story':>11} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'fallback/story':>14} {'errors':>6} {'malformed':>9} {'peak MB':>8}"
+    )
+    print(header)
+    with tempfile.TemporaryDirectory(prefix="wolverine-bench-") as tmp:
+        for words in args.story_words:
+            for size in args.sizes:
+                dataset_path = write_dataset(Path(tmp) / f"data_{size}_{words}.csv", size, words, args.seed)
+                for mode in args.modes:
+                    work_dir = Path(tmp) / f"{mode}_{size}_{words}"
+                    work_dir.mkdir()
+                    before = backend.stats()
+                    result = run_in_subprocess(
+                        mode, dataset_path, base_url, work_dir, args.sync_limit if mode == "sync" else None
+                    )
+                    after = backend.stats()
+                    result.update(
+                        mode=mode,
+                        story_words=words,
+                        backend_errors=after["errors"] - before["errors"],
+                        backend_malformed=after["malformed"] - before["malformed"],
+                    )
+                    results.append(result)
+                    print(
+                        f"{mode:>8} {result['stories']:>7} {words:>6} {result['stories_per_sec']:>10} "
+                        f"{result['calls_per_story']:>11} {result['latency_p50_ms']:>8} {result['latency_p99_ms']:>8} "
+                        f"{result['fallbacks_per_story']:>14} {result['backend_errors']:>6} "
+                        f"{result['backend_malformed']:>9} {result['peak_rss_mb']:>8}",
+                        flush=True,
+                    )
+    fake_server.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump({"settings": vars(args), "results": results}, handle, indent=2)
+        print(f"[INFO] Wrote {len(results)} results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""Evaluator agreement analytics over a columnar score matrix.
+
+Every ``*_result.csv`` in the results directory (one per evaluator model, as
+written by evaluate_dataset_multi_model) and the baseline file are aligned on
+their (index, model) story keys into one float32 matrix of shape
+story x category x evaluator, with NaN where an evaluator has no score. The
+matrix and its metadata can be saved as an .npz file and reloaded without
+parsing the CSVs again. All statistics are computed for every evaluator at
+once with NumPy and reproduce the tables of notebooks/results_summary.ipynb:
+
+    python src/analysis.py --results-dir dataset/results [--save-matrix scores.npz] [--out-dir tables/]
+    python src/analysis.py --matrix scores.npz
+"""
+
+import argparse
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+from categories import NEGATIVE_CATEGORIES, POSITIVE_CATEGORIES
+from config import RESULTS_DIR
+
+BASELINE_FILENAME = "Claude-Sonnet-4(LLMasJudge).csv"
+BASELINE_LABEL = "Claude Sonnet 4 (baseline)"
+CATEGORIES = POSITIVE_CATEGORIES + NEGATIVE_CATEGORIES
+CREATIVITY_COLUMNS = ["creativity_standalone_score", "creativity_contextual_score", "creativity_difference"]
+
+
+def pretty_name(stem: str) -> str:
+    """Short evaluator label used in the notebook, e.g. Llama-3.1-8B-Instruct -> Llama-3.1-8B."""
+    for old, new in (("_", " "), ("-Instruct", ""), ("-it", ""), ("-result", ""), ("-2507", "")):
+        stem = stem.replace(old, new)
+    return stem
+
+
+######## Columnar score matrix ########
+@dataclass
+class ScoreMatrix:
+    """Scores of every story, category and evaluator; the baseline (if any) is the last evaluator."""
+
+    scores: np.ndarray  # float32 [story, category, evaluator], NaN = not scored
+    creativity: np.ndarray  # float32 [story, creativity column, evaluator]
+    story_index: np.ndarray  # int64 [story]
+    story_model: np.ndarray  # str [story]
+    categories: list[str]
+    evaluators: list[str]  # Result file stems
+    labels: list[str]  # Display names
+    has_baseline: bool
+
+    @property
+    def positive(self) -> np.ndarray:
+        """Boolean mask over ``categories`` of the positive (higher is better) ones."""
+        return np.isin(self.categories, POSITIVE_CATEGORIES)
+
+    def save(self, path: str | Path) -> None:
+        np.savez_compressed(
+            path,
+            scores=self.scores,
+            creativity=self.creativity,
+            story_index=self.story_index,
+            story_model=self.story_model,
+            categories=np.array(self.categories),
+            evaluators=np.array(self.evaluators),
+            labels=np.array(self.labels),
+            has_baseline=np.array(self.has_baseline),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ScoreMatrix":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                scores=data["scores"],
+                creativity=data["creativity"],
+                story_index=data["story_index"],
+                story_model=data["story_model"],
+                categories=data["categories"].tolist(),
+                evaluators=data["evaluators"].tolist(),
+                labels=data["labels"].tolist(),
+                has_baseline=bool(data["has_baseline"]),
+            )
+
+
+def _read_result_csv(path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return (index, model, category scores, creativity scores) of one result file."""
+    import pandas as pd  # Only needed to parse the CSVs, not for a saved matrix
+
+    score_columns = [f"{cat}_score" for cat in CATEGORIES]
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [c for c in ["index", "model"] + score_columns if c not in header]
+    if missing:
+        raise ValueError(f"{path}: missing columns {', '.join(missing)}")
+    creativity_columns = [c for c in CREATIVITY_COLUMNS if c in header]
+    # Unscored categories are empty cells and parse as NaN
+    df = pd.read_csv(
+        path,
+        usecols=["index", "model"] + score_columns + creativity_columns,
+        dtype={"index": np.int64, "model": str} | {c: np.float32 for c in score_columns + creativity_columns},
+        keep_default_na=False,
+        na_values=[""],
+    )
+    creativity = np.full((len(df), len(CREATIVITY_COLUMNS)), np.nan, dtype=np.float32)
+    for i, c in enumerate(CREATIVITY_COLUMNS):
+        if c in df:
+            creativity[:, i] = df[c].to_numpy()
+    return df["index"].to_numpy(), df["model"].to_numpy(dtype=str), df[score_columns].to_numpy(), creativity
+
+
+def build_score_matrix(results_dir: str | Path = RESULTS_DIR, baseline_path: str | Path | None = None) -> ScoreMatrix:
+    """Load every ``*_result.csv`` of ``results_dir`` (and the baseline) into one ScoreMatrix."""
+    results_dir = Path(results_dir)
+    baseline_path = Path(baseline_path) if baseline_path else results_dir / BASELINE_FILENAME
+    files = sorted(results_dir.glob("*_result.csv"))
+    stems = [f.name.removesuffix("_result.csv") for f in files]
+    labels = [pretty_name(stem) for stem in stems]
+    has_baseline = baseline_path.exists()
+    if has_baseline:
+        files.append(baseline_path)
+        stems.append(baseline_path.stem)
+        labels.append(BASELINE_LABEL)
+    if not files:
+        raise ValueError(f"No *_result.csv files in {results_dir}")
+
+    loaded = [_read_result_csv(f) for f in files]
+    # One row per distinct (index, model) story key over all files
+    all_index = np.concatenate([index for index, _, _, _ in loaded])
+    all_model = np.concatenate([model for _, model, _, _ in loaded])
+    keys = np.rec.fromarrays([all_index, all_model], names="index,model")
+    unique_keys, story_of = np.unique(keys, return_inverse=True)
+
+    scores = np.full((len(unique_keys), len(CATEGORIES), len(files)), np.nan, dtype=np.float32)
+    creativity = np.full((len(unique_keys), len(CREATIVITY_COLUMNS), len(files)), np.nan, dtype=np.float32)
+    offset = 0
+    for e, (f, (index, _, file_scores, file_creativity)) in enumerate(zip(files, loaded)):
+        rows = story_of[offset:offset + len(index)]
+        offset += len(index)
+        if len(np.unique(rows)) != len(rows):
+            raise ValueError(f"{f}: duplicate (index, model) keys")
+        scores[rows, :, e] = file_scores
+        creativity[rows, :, e] = file_creativity
+    print(f"[INFO] Loaded {len(files)} result files: {len(unique_keys)} stories x {len(CATEGORIES)} categories")
+    return ScoreMatrix(
+        scores=scores,
+        creativity=creativity,
+        story_index=unique_keys["index"].astype(np.int64),
+        story_model=unique_keys["model"].astype(str),
+        categories=list(CATEGORIES),
+        evaluators=stems,
+        labels=labels,
+        has_baseline=has_baseline,
+    )
+
+
+######## Vectorized statistics ########
+def _nanmean(values: np.ndarray, axis) -> np.ndarray:
+    # np.nanmean warns on all-NaN slices; those stay NaN here without the warning
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=axis)
+    total = np.where(valid, values, 0).sum(axis=axis, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def rank_columns(values: np.ndarray) -> np.ndarray:
+    """Average ranks (1-based, ties share their mean rank) along axis 0; NaN stays NaN and is not ranked."""
+    # Sorting along a contiguous last axis is several times faster than along the strided story axis
+    values = np.ascontiguousarray(np.moveaxis(values, 0, -1))
+    n = values.shape[-1]
+    order = np.argsort(values, axis=-1)  # NaN sorts last; tie order does not matter for average ranks
+    ordered = np.take_along_axis(values, order, axis=-1)
+    position = np.broadcast_to(np.arange(n), values.shape)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[..., :-1] = starts[..., 1:]
+    first = np.maximum.accumulate(np.where(starts, position, 0), axis=-1)
+    last = np.flip(np.minimum.accumulate(np.flip(np.where(ends, position, n), axis=-1), axis=-1), axis=-1)
+    ranks = np.empty(values.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=-1)
+    ranks[np.isnan(values)] = np.nan
+    return np.moveaxis(ranks, -1, 0)
+
+
+def pearson(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pearson correlation along axis 0 over the rows where both are present."""
+    valid = ~(np.isnan(a) | np.isnan(b))
+    if valid.all():
+        da = a - a.mean(axis=0)
+        db = b - b.mean(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (da * db).sum(axis=0) / np.sqrt((da * da).sum(axis=0) * (db * db).sum(axis=0))
+    a = np.where(valid, a, np.nan).astype(np.float64)
+    b = np.where(valid, b, np.nan).astype(np.float64)
+    da = a - _nanmean(a, 0)
+    db = b - _nanmean(b, 0)
+    cov = np.nansum(da * db, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cov / np.sqrt(np.nansum(da * da, axis=0) * np.nansum(db * db, axis=0))
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Spearman rank correlation along axis 0 over the rows where both are present.
+
+    ``b`` may have size 1 on the last axis to compare every column of ``a`` with one reference.
+    """
+    valid = ~(np.isnan(a) | np.isnan(b))
+    if b.shape[-1] == 1 and (valid == valid[..., :1]).all():
+        # Every column compares the same rows, so the reference is ranked once
+        b_ranks = rank_columns(np.where(valid[..., :1], b, np.nan))
+    else:
+        b_ranks = rank_columns(np.where(valid, b, np.nan))
+    return pearson(rank_columns(np.where(valid, a, np.nan)), b_ranks)
+
+
+@dataclass
+class AgreementReport:
+    """Statistics of every evaluator; per-category arrays are [category, evaluator]."""
+
+    labels: list[str]  # Evaluators compared with the baseline (baseline excluded)
+    categories: list[str]
+    positive: np.ndarray
+    positive_mean: dict[str, float]  # Every evaluator and the baseline
+    negative_mean: dict[str, float]
+    bias: np.ndarray | None = None
+    mae: np.ndarray | None = None
+    rmse: np.ndarray | None = None
+    pearson: np.ndarray | None = None
+    spearman: np.ndarray | None = None
+    summary: dict[str, np.ndarray] | None = None  # Pooled over category groups, one value per evaluator
+
+
+def compute_agreement(matrix: ScoreMatrix) -> AgreementReport:
+    """Means per category direction for every evaluator and, with a baseline, bias/MAE/RMSE/correlations against it."""
+    positive = matrix.positive
+    category_means = _nanmean(matrix.scores, 0)  # [category, evaluator]
+    report = AgreementReport(
+        labels=matrix.labels[:-1] if matrix.has_baseline else list(matrix.labels),
+        categories=matrix.categories,
+        positive=positive,
+        positive_mean=dict(zip(matrix.labels, _nanmean(category_means[positive], 0).tolist())),
+        negative_mean=dict(zip(matrix.labels, _nanmean(category_means[~positive], 0).tolist())),
+    )
+    if not matrix.has_baseline:
+        return report
+
+    evaluated = matrix.scores[:, :, :-1].astype(np.float64)
+    baseline = matrix.scores[:, :, -1:].astype(np.float64)  # Broadcasts over the evaluators
+    diff = evaluated - baseline  # NaN unless both scored the story
+    report.bias = _nanmean(diff, 0)
+    report.mae = _nanmean(np.abs(diff), 0)
+    report.rmse = np.sqrt(_nanmean(diff ** 2, 0))
+    report.pearson = pearson(evaluated, baseline)
+    report.spearman = spearman(evaluated, baseline)
+
+    summary = {}
+    n_stories, _, n_evaluators = diff.shape
+    for group, mask in (("pos", positive), ("neg", ~positive), ("overall", np.ones_like(positive))):
+        # Pool every (story, category) cell of the group, as the notebook concatenates the columns
+        pooled = diff[:, mask].reshape(-1, n_evaluators)
+        summary[f"{group}_mae"] = _nanmean(np.abs(pooled), 0)
+        summary[f"{group}_rmse"] = np.sqrt(_nanmean(pooled ** 2, 0))
+    pooled_evaluated = evaluated.reshape(-1, n_evaluators)
+    pooled_baseline = baseline.reshape(-1, 1)
+    summary["overall_pearson"] = pearson(pooled_evaluated, pooled_baseline)
+    summary["overall_spearman"] = spearman(pooled_evaluated, pooled_baseline)
+    report.summary = summary
+    return report
+
+
+######## Summary tables ########
+def _format_table(title: str, header: list[str], rows: list[list]) -> str:
+    cells = [[str(h) for h in header]] + [[f"{v:.4f}" if isinstance(v, float) else str(v) for v in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    lines = [title]
+    for row in cells:
+        lines.append("  ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths))))
+    return "\n".join(lines)
+
+
+def summary_tables(report: AgreementReport) -> dict[str, tuple[list[str], list[list]]]:
+    """The notebook's tables as {name: (header, rows)}, sorted as the notebook sorts them."""
+    tables = {
+        "positive_mean": (
+            ["evaluator", "positive_mean"],
+            sorted(([k, v] for k, v in report.positive_mean.items()), key=lambda r: r[1]),
+        ),
+        "negative_mean": (
+            ["evaluator", "negative_mean"],
+            sorted(([k, v] for k, v in report.negative_mean.items()), key=lambda r: r[1]),
+        ),
+    }
+    if report.summary is None:
+        return tables
+
+    columns = ["pos_mae", "pos_rmse", "neg_mae", "neg_rmse", "overall_mae", "overall_rmse", "overall_pearson", "overall_spearman"]
+    order = np.argsort(report.summary["overall_rmse"], kind="stable")
+    tables["metrics_summary"] = (
+        ["evaluator"] + columns,
+        [[report.labels[e]] + [float(report.summary[c][e]) for c in columns] for e in order],
+    )
+    ranked_labels = [report.labels[e] for e in order]
+    alphabetical = sorted(range(len(report.labels)), key=lambda e: report.labels[e])
+    for cat_type, mask in (("positive", report.positive), ("negative", ~report.positive)):
+        categories = np.array(report.categories)[mask]
+        # Bias heatmap: evaluators alphabetically, categories by mean absolute bias
+        bias = report.bias[mask]
+        rows = np.argsort(-_nanmean(np.abs(bias), 1), kind="stable")
+        tables[f"{cat_type}_bias"] = (
+            ["category"] + [report.labels[e] for e in alphabetical],
+            [[categories[r]] + [float(bias[r, e]) for e in alphabetical] for r in rows],
+        )
+        # Error heatmaps: evaluators by overall RMSE, categories by mean error
+        for metric in ("rmse", "mae", "pearson", "spearman"):
+            values = getattr(report, metric)[mask]
+            descending = metric in ("rmse", "mae")
+            rows = np.argsort(-_nanmean(values, 1) if descending else _nanmean(values, 1), kind="stable")
+            tables[f"{cat_type}_{metric}"] = (
+                ["category"] + ranked_labels,
+                [[categories[r]] + [float(values[r, e]) for e in order] for r in rows],
+            )
+    return tables
+
+
+def write_tables(tables: dict[str, tuple[list[str], list[list]]], out_dir: str | Path) -> None:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, (header, rows) in tables.items():
+        with open(out_dir / f"{name}.csv", "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            writer.writerows(rows)
+    print(f"[INFO] Wrote {len(tables)} tables to {out_dir}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluator agreement summary (see notebooks/results_summary.ipynb).")
+    parser.add_argument("--results-dir", default=str(RESULTS_DIR), help="Directory with the *_result.csv files")
+    parser.add_argument("--baseline", default=None, help=f"Baseline result file (default: <results-dir>/{BASELINE_FILENAME})")
+    parser.add_argument("--matrix", default=None, help="Read a score matrix saved with --save-matrix instead of the CSVs")
+    parser.add_argument("--save-matrix", default=None, help="Save the score matrix to this .npz file")
+    parser.add_argument("--out-dir", default=None, help="Also write every table as CSV into this directory")
+    args = parser.parse_args()
+
+    matrix = ScoreMatrix.load(args.matrix) if args.matrix else build_score_matrix(args.results_dir, args.baseline)
+    if args.save_matrix:
+        matrix.save(args.save_matrix)
+        print(f"[INFO] Saved score matrix to {args.save_matrix}")
+    if not matrix.has_baseline:
+        print("[WARNING] No baseline file; only the category means are reported")
+
+    tables = summary_tables(compute_agreement(matrix))
+    for name, (header, rows) in tables.items():
+        print()
+        print(_format_table(name, header, rows))
+    if args.out_dir:
+        write_tables(tables, args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Offline evaluation through OpenAI Batch-format JSONL files (e.g. for vLLM's run_batch).
+
+A batch run lives in a work directory and moves through rounds, because later
+prompts depend on earlier answers:
+
+    1. initial     standalone creativity + combined category scoring
+    2. repair      re-ask categories missing from the combined reply
+    3. contextual  creativity given all category scores
+    4. analysis    which categories explain the creativity difference
+
+Rounds with nothing to ask are skipped. Usage:
+
+    python src/batch.py export --work-dir dataset/batch/run1
+    python -m vllm.entrypoints.openai.run_batch -i <round input> -o <round output> --model <model>
+    python src/batch.py ingest --work-dir dataset/batch/run1 --output <round output>
+    ... repeat run_batch / ingest for each emitted round until the result CSV is written
+"""
+
+import argparse
+import csv
+import json
+import os
+from pathlib import Path
+from clients import build_chat_request
+from config import DATASET_PATH, RESULTS_DIR, WOLVERINE_SETTINGS
+from engine import RESULT_COLUMNS, build_result_row
+from evaluation import (
+    ANALYSIS_SCHEMA,
+    SCORE_SCHEMA,
+    SCORES_SCHEMA,
+    STORY_EVALUATION_CATEGORIES,
+    EvaluationResult,
+    StoryEvaluation,
+    build_analysis_result,
+    build_scores_schema,
+)
+from parsing import clamp_score, parse_combined_response, parse_influential_categories, parse_response
+from prompts import ChatPrompt, PromptSet, get_prompt_set
+
+ROUNDS = ["initial", "repair", "contextual", "analysis"]
+# custom_id stages each round's requests carry
+ROUND_STAGES = {
+    "initial": {"creativity", "scores"},
+    "repair": {"repair"},
+    "contextual": {"contextual"},
+    "analysis": {"analysis"},
+}
+STATE_FILENAME = "state.json"
+
+
+def make_custom_id(index: int, stage: str) -> str:
+    """Stable request id, e.g. story-42-scores."""
+    return f"story-{index}-{stage}"
+
+
+def split_custom_id(custom_id: str) -> tuple[int, str]:
+    _, index, stage = custom_id.split("-", 2)
+    return int(index), stage
+
+
+class BatchRun:
+    """State of one offline evaluation run, persisted as state.json in its work directory."""
+
+    def __init__(self, work_dir: str | Path):
+        self.work_dir = Path(work_dir)
+        self.state_path = self.work_dir / STATE_FILENAME
+        self.state: dict = {}
+
+    @classmethod
+    def create(
+        cls,
+        work_dir: str | Path,
+        dataset_path: str | Path = DATASET_PATH,
+        model: str | None = None,
+        structured_output: bool | None = None,
+        prompt_version: str | None = None,
+    ) -> "BatchRun":
+        run = cls(work_dir)
+        if run.state_path.exists():
+            raise FileExistsError(f"{run.state_path} already exists; use a new work directory")
+        s = WOLVERINE_SETTINGS
+        run.state = {
+            "dataset_path": str(dataset_path),
+            "model": model or s.model,
+            "temperature": s.temperature,
+            "structured_output": s.structured_output if structured_output is None else structured_output,
+            "prompt_version": get_prompt_set(prompt_version).version,
+            "round": None,
+            "rows": {},
+        }
+        return run
+
+    @classmethod
+    def load(cls, work_dir: str | Path) -> "BatchRun":
+        run = cls(work_dir)
+        with open(run.state_path, encoding="utf-8") as f:
+            run.state = json.load(f)
+        return run
+
+    @property
+    def prompts(self) -> PromptSet:
+        # Runs started before prompt versioning used the original layout
+        return get_prompt_set(self.state.get("prompt_version", "1"))
+
+    def export_initial(self) -> Path:
+        """Write the first round: standalone creativity and combined scoring for every story."""
+        requests = []
+        for index, model, story in self._read_dataset():
+            self.state["rows"][str(index)] = {"model": model}
+            requests.append(self._request(index, "creativity", self.prompts.creativity(story), SCORE_SCHEMA))
+            requests.append(self._request(index, "scores", self.prompts.scores(story), SCORES_SCHEMA))
+        return self._write_round("initial", requests)
+
+    def ingest(self, output_path: str | Path, results_path: str | Path | None = None) -> Path:
+        """Read the completed output of the current round and write the next round (or the result CSV).
+
+        Returns the path of the next round's input file, or of the result CSV once every round is done.
+        """
+        current = self.state["round"]
+        if current not in ROUNDS:
+            raise ValueError(f"Nothing to ingest: batch run is in state {current!r}")
+        responses = _read_batch_output(output_path)
+        rows = self.state["rows"]
+        # Re-ingesting another round's output would overwrite scores and skip rounds
+        foreign = sorted({split_custom_id(custom_id)[1] for custom_id in responses} - ROUND_STAGES[current])
+        if foreign:
+            raise ValueError(
+                f"{output_path} has '{', '.join(foreign)}' requests, but the batch run is in round '{current}'"
+            )
+
+        for custom_id, response in responses.items():
+            index, stage = split_custom_id(custom_id)
+            row = rows[str(index)]
+            if stage == "creativity":
+                row["standalone"] = _creativity_score(response)
+            elif stage == "scores":
+                row["scores"] = parse_combined_response(response)
+            elif stage == "repair":
+                row["scores"].update(parse_combined_response(response))
+            elif stage == "contextual":
+                row["contextual"] = _creativity_score(response)
+            elif stage == "analysis":
+                row["influential_categories"] = parse_influential_categories(response)
+
+        # Requests that produced no output (errors) still advance with what we have
+        for row in rows.values():
+            row.setdefault("standalone", None)
+            row.setdefault("scores", {})
+
+        for round_name in ROUNDS[ROUNDS.index(current) + 1:]:
+            requests = self._build_round(round_name)
+            if requests:
+                return self._write_round(round_name, requests)
+        return self._write_results(results_path)
+
+    def _build_round(self, round_name: str) -> list[dict]:
+        stories = None
+        rows = self.state["rows"]
+        requests = []
+        if round_name == "repair":
+            pending = {i: [c for c in STORY_EVALUATION_CATEGORIES if c not in row["scores"]] for i, row in rows.items()}
+            pending = {i: missing for i, missing in pending.items() if missing}
+            if pending:
+                stories = self._stories(pending)
+            for i, missing in pending.items():
+                requests.append(self._request(
+                    int(i), "repair", self.prompts.repair(stories[i], missing), build_scores_schema(missing)
+                ))
+        elif round_name == "contextual":
+            stories = self._stories(rows)
+            for i, row in rows.items():
+                results = self._category_results(row)
+                requests.append(self._request(
+                    int(i), "contextual", self.prompts.contextual(stories[i], results), SCORE_SCHEMA
+                ))
+        elif round_name == "analysis":
+            pending = {
+                i: row for i, row in rows.items()
+                if row["standalone"] is not None and row.get("contextual") is not None
+                and abs(row["standalone"] - row["contextual"]) >= 0.1
+            }
+            if pending:
+                stories = self._stories(pending)
+            for i, row in pending.items():
+                prompt = self.prompts.analysis(
+                    stories[i], row["standalone"], row["contextual"], self._category_results(row)
+                )
+                requests.append(self._request(int(i), "analysis", prompt, ANALYSIS_SCHEMA))
+        return requests
+
+    def _write_results(self, results_path: str | Path | None) -> Path:
+        if results_path is None:
+            model_name = self.state["model"].split("/")[-1]
+            results_path = RESULTS_DIR / f"batch_{self.work_dir.name}_{model_name}.csv"
+        results_path = Path(results_path)
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(results_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for i in sorted(self.state["rows"], key=int):
+                row = self.state["rows"][i]
+                standalone = EvaluationResult(category="Creativity", score=row["standalone"])
+                results = self._category_results(row)
+                results["Creativity"] = EvaluationResult(category="Creativity", score=row.get("contextual"))
+                analysis = build_analysis_result(
+                    row["standalone"], results["Creativity"].score, row.get("influential_categories", [])
+                )
+                evaluation = StoryEvaluation(standalone, results, analysis, self.prompts.version)
+                writer.writerow(build_result_row(int(i), row["model"], evaluation))
+
+        self.state["round"] = "done"
+        self.state["results_path"] = str(results_path)
+        self._save()
+        print(f"[INFO] Batch run complete. Results saved to {results_path}")
+        return results_path
+
+    def _request(self, index: int, stage: str, prompt: ChatPrompt, json_schema: dict) -> dict:
+        return {
+            "custom_id": make_custom_id(index, stage),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_chat_request(
+                model=self.state["model"],
+                temperature=self.state["temperature"],
+                system_prompt=prompt.system,
+                user_prompt=prompt.user,
+                json_schema=json_schema if self.state["structured_output"] else None,
+            ),
+        }
+
+    def _write_round(self, round_name: str, requests: list[dict]) -> Path:
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        number = ROUNDS.index(round_name) + 1
+        path = self.work_dir / f"round{number}_{round_name}_input.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for request in requests:
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        self.state["round"] = round_name
+        self._save()
+        print(f"[INFO] Wrote {len(requests)} requests for round '{round_name}' to {path}")
+        return path
+
+    def _save(self) -> None:
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _read_dataset(self):
+        with open(self.state["dataset_path"], newline="", encoding="utf-8-sig") as f:
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, row.get("model", ""), row.get("response", "")
+
+    def _stories(self, indices) -> dict[str, str]:
+        wanted = set(indices)
+        return {str(index): story for index, _, story in self._read_dataset() if str(index) in wanted}
+
+    @staticmethod
+    def _category_results(row: dict) -> dict[str, EvaluationResult]:
+        return {
+            cat: EvaluationResult(category=cat, score=row["scores"].get(cat))
+            for cat in STORY_EVALUATION_CATEGORIES
+        }
+
+
+def _creativity_score(response: str) -> float | None:
+    # Clamped creativity score, or None when the reply has none (not 0.0, which would read as a real score)
+    score = parse_response(response)
+    return clamp_score(score) if score is not None else None
+
+
+def _read_batch_output(path: str | Path) -> dict[str, str]:
+    """Map custom_id -> response text from a Batch-format output file; failed requests are skipped."""
+    responses = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code", 200) != 200:
+                print(f"[WARNING] Batch request {record.get('custom_id')} failed: {record.get('error')}")
+                continue
+            choices = (response.get("body") or {}).get("choices") or [{}]
+            content = (choices[0].get("message") or {}).get("content") or ""
+            responses[record["custom_id"]] = content.strip()
+    return responses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline story evaluation via Batch-format JSONL files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Start a run and write the first round's input file")
+    export_parser.add_argument("--work-dir", required=True)
+    export_parser.add_argument("--dataset", default=str(DATASET_PATH))
+    export_parser.add_argument("--model", default=None)
+    export_parser.add_argument("--structured-output", action="store_true", default=None)
+    export_parser.add_argument("--prompt-version", default=None)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest a round's output and write the next round")
+    ingest_parser.add_argument("--work-dir", required=True)
+    ingest_parser.add_argument("--output", required=True, help="Batch output JSONL of the current round")
+    ingest_parser.add_argument("--results", default=None, help="Result CSV path (written after the last round)")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        run = BatchRun.create(args.work_dir, args.dataset, args.model, args.structured_output, args.prompt_version)
+        print(run.export_initial())
+    else:
+        print(BatchRun.load(args.work_dir).ingest(args.output, args.results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Persistent, content-addressed cache for LLM chat responses (SQLite)."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Recency updates of cache hits are written in batches of this many
+TOUCH_BATCH_SIZE = 256
+
+
+class ResponseCache:
+    """SQLite-backed response cache keyed by (model, temperature, system prompt, user prompt).
+
+    Entries are evicted least-recently-used first once ``max_entries`` is exceeded.
+    Safe to share between threads and between the sync and async clients.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self._path = path
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # key -> last access of hits not yet written, so a hit costs no write transaction
+        self._pending_touches: dict[str, float] = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(
+        *,
+        model: str,
+        temperature: float,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: dict | None = None,
+        n: int = 1,
+    ) -> str:
+        """Hash the request parameters into a stable cache key."""
+        parts = [model, temperature, system_prompt, user_prompt]
+        if json_schema is not None:
+            # Guided decoding changes the output distribution, so it gets its own entries
+            parts.append(json_schema)
+        if n > 1:
+            # Multi-sample requests cache the list of all completions
+            parts.append({"n": n})
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response for ``key`` or None, updating recency and hit/miss counters.
+
+        The new access time is buffered and written with the next batch of
+        touches (or before an eviction), not on every hit.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._pending_touches[key] = time.time()
+            if len(self._pending_touches) >= TOUCH_BATCH_SIZE:
+                self._flush_touches()
+            return row[0]
+
+    def _flush_touches(self) -> None:
+        # Called with the lock held
+        if self._pending_touches:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._pending_touches.items()],
+            )
+            self._pending_touches.clear()
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response, evicting the least recently used entries if the cache is full."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO responses (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "UPDATE responses SET response = ?, last_access = ? WHERE key = ?", (response, now, key)
+                )
+                return
+            self._entries += 1
+            overflow = self._entries - self._max_entries
+            if overflow > 0:
+                # Evict by up-to-date recency
+                self._flush_touches()
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._entries -= overflow
+                self._evictions += overflow
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._pending_touches.clear()
+            self._entries = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "path": self._path,
+                "entries": self._entries,
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,44 @@
+"""Story evaluation categories and their direction (positive: higher is better, negative: lower is better)."""
+
+# Positive metrics: Higher is Better (0-20 scale)
+POSITIVE_CATEGORIES = [
+    "Adherence to Instructions",
+    "Believable Character Actions",
+    "Nuanced Characters",
+    "Consistent Voice / Tone of Writing",
+    "Imagery and Descriptive Quality",
+    "Elegant Prose",
+    "Emotionally Engaging",
+    "Emotionally Complex",
+    "Coherent",
+    "Well-earned Lightness or Darkness",
+    "Sentences Flow Naturally",
+    "Overall Reader Engagement",
+    "Overall Impression",
+]
+
+# Negative / Penalty metrics: Lower is Better (0-20 scale, lower scores indicate less of the problem)
+NEGATIVE_CATEGORIES = [
+    "Meandering",
+    "Weak Dialogue",
+    "Tell-Don't-Show",
+    "Unsurprising or Uncreative",
+    "Amateurish",
+    "Purple Prose",
+    "Overwrought",
+    "Incongruent Ending Positivity",
+    "Unearned Transformations",
+]
+
+STORY_EVALUATION_CATEGORIES = POSITIVE_CATEGORIES + NEGATIVE_CATEGORIES
+
+CATEGORY_TYPES = {cat: "positive" for cat in POSITIVE_CATEGORIES}
+CATEGORY_TYPES.update({cat: "negative" for cat in NEGATIVE_CATEGORIES})
+
+def is_positive_category(category: str) -> bool:
+    """Check if a category is a positive metric (higher is better)."""
+    return CATEGORY_TYPES.get(category) == "positive"
+
+def is_negative_category(category: str) -> bool:
+    """Check if a category is a negative/penalty metric (lower is better)."""
+    return CATEGORY_TYPES.get(category) == "negative"
@@ -1,29 +1,232 @@
 """Client wrapper for communicating with the Wolverine (vLLM) OpenAI-compatible API."""
 
+import json
 import sys
-from openai import OpenAI
+from collections.abc import Callable
+from cache import ResponseCache
+from concurrency import ConcurrencyLimiter
 from config import WOLVERINE_SETTINGS
+from metrics import METRICS
+from router import EndpointRouter
 
 
-class WolverineClient:
-    """Lightweight wrapper around the Wolverine OpenAI-compatible endpoint."""
+def build_chat_request(
+    *, model: str, temperature: float, system_prompt: str, user_prompt: str, json_schema: dict | None = None, n: int = 1
+) -> dict:
+    """Build the body of a /v1/chat/completions request (``n`` > 1 asks for several completions of one prompt)."""
+    body = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": temperature,
+    }
+    if n > 1:
+        body["n"] = n
+    if json_schema is not None:
+        # vLLM turns a json_schema response_format into guided decoding, so the reply always parses
+        body["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": json_schema.get("title", "response"), "schema": json_schema},
+        }
+    return body
+
+
+class _WolverineClientBase:
+    """Request building and response caching shared by the sync and async clients."""
 
-    def __init__(self):
+    def __init__(self, cache: ResponseCache | None, router: EndpointRouter | None, model: str | None):
         s = WOLVERINE_SETTINGS
-        self._client = OpenAI(base_url=s.base_url, api_key=s.api_key)
-        self._model = s.model
+        self._model = model or s.model
         self._temperature = s.temperature
+        self._cache = cache
+        self._router = router or EndpointRouter.from_settings(s)
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def temperature(self) -> float:
+        return self._temperature
 
-    def chat(self, *, system_prompt: str, user_prompt: str) -> str:
-        """Send a chat request to the model and return the text content."""
-        completion = self._client.chat.completions.create(
+    @property
+    def router(self) -> EndpointRouter:
+        return self._router
+
+    def _lookup(
+        self, system_prompt: str, user_prompt: str, json_schema: dict | None, use_cache: bool, n: int = 1
+    ) -> tuple[str | None, str | None]:
+        """Return (cache_key, cached_response); the key is None when caching is off for this call."""
+        if self._cache is None or not use_cache:
+            return None, None
+        cache_key = ResponseCache.make_key(
             model=self._model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
             temperature=self._temperature,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            json_schema=json_schema,
+            n=n,
         )
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            METRICS.record_cache_hit()
+        return cache_key, cached
+
+    def _request_kwargs(self, system_prompt: str, user_prompt: str, json_schema: dict | None, n: int = 1) -> dict:
+        return build_chat_request(
+            model=self._model,
+            temperature=self._temperature,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            json_schema=json_schema,
+            n=n,
+        )
+
+    def _finish(self, completion, cache_key: str | None, validate: Callable[[str], bool] | None) -> str:
         response = (completion.choices[0].message.content or "").strip()
         print(f"[API] Request completed - Response length: {len(response)} chars", file=sys.stderr, flush=True)
-        return response
\ No newline at end of file
+        # A reply that does not parse is not cached, so the next run asks again instead of replaying it
+        if cache_key is not None and response and (validate is None or validate(response)):
+            self._cache.put(cache_key, response)
+        return response
+
+    def _finish_samples(self, completion, cache_key: str | None, validate: Callable[[str], bool] | None) -> list[str]:
+        responses = [(choice.message.content or "").strip() for choice in completion.choices]
+        print(f"[API] Request completed - {len(responses)} samples", file=sys.stderr, flush=True)
+        if cache_key is not None and all(responses) and (validate is None or all(map(validate, responses))):
+            # All samples of one request are cached together as a JSON list
+            self._cache.put(cache_key, json.dumps(responses, ensure_ascii=False))
+        return responses
+
+
+class WolverineClient(_WolverineClientBase):
+    """Lightweight wrapper around the Wolverine OpenAI-compatible endpoint."""
+
+    def __init__(
+        self,
+        cache: ResponseCache | None = None,
+        router: EndpointRouter | None = None,
+        model: str | None = None,
+    ):
+        super().__init__(cache, router, model)
+
+    def chat(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: dict | None = None,
+        use_cache: bool = True,
+        validate: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Send a chat request to the model and return the text content.
+
+        ``json_schema`` constrains the reply with guided decoding. Responses are
+        served from the cache when one is configured; pass ``use_cache=False``
+        to force a fresh sample. With ``validate`` only replies it accepts are
+        cached.
+        """
+        cache_key, cached = self._lookup(system_prompt, user_prompt, json_schema, use_cache)
+        if cached is not None:
+            return cached
+
+        completion = self._router.create(**self._request_kwargs(system_prompt, user_prompt, json_schema))
+        return self._finish(completion, cache_key, validate)
+
+    def chat_samples(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        n: int,
+        json_schema: dict | None = None,
+        use_cache: bool = True,
+        validate: Callable[[str], bool] | None = None,
+    ) -> list[str]:
+        """Request ``n`` completions of one prompt in a single call (the server prefills the prompt once).
+
+        The samples are cached together, and only when ``validate`` accepts every one of them.
+        """
+        cache_key, cached = self._lookup(system_prompt, user_prompt, json_schema, use_cache, n)
+        if cached is not None:
+            return json.loads(cached)
+
+        completion = self._router.create(**self._request_kwargs(system_prompt, user_prompt, json_schema, n))
+        return self._finish_samples(completion, cache_key, validate)
+
+
+class AsyncWolverineClient(_WolverineClientBase):
+    """Async wrapper around the Wolverine endpoint with a cap on in-flight requests.
+
+    With ``adaptive_concurrency`` (the default from settings) the cap starts at
+    ``max_concurrency`` and is tuned from observed latency and overload errors.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        cache: ResponseCache | None = None,
+        router: EndpointRouter | None = None,
+        model: str | None = None,
+        adaptive_concurrency: bool | None = None,
+    ):
+        super().__init__(cache, router, model)
+        s = WOLVERINE_SETTINGS
+        self._limiter = ConcurrencyLimiter(
+            max_concurrency or s.max_concurrency,
+            adaptive=s.adaptive_concurrency if adaptive_concurrency is None else adaptive_concurrency,
+            min_limit=s.min_concurrency,
+            max_limit=s.max_concurrency_limit,
+        )
+
+    @property
+    def max_concurrency(self) -> int:
+        """Current in-flight limit (the adaptive limit as tuned so far); read it live, it changes during a run."""
+        return self._limiter.limit
+
+    @property
+    def limiter(self) -> ConcurrencyLimiter:
+        return self._limiter
+
+    async def chat(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        json_schema: dict | None = None,
+        use_cache: bool = True,
+        validate: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Send a chat request to the model and return the text content (see WolverineClient.chat)."""
+        cache_key, cached = self._lookup(system_prompt, user_prompt, json_schema, use_cache)
+        if cached is not None:
+            return cached
+
+        async with self._limiter.slot():
+            completion = await self._router.acreate(
+                on_error=self._limiter.record_error, **self._request_kwargs(system_prompt, user_prompt, json_schema)
+            )
+        return self._finish(completion, cache_key, validate)
+
+    async def chat_samples(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        n: int,
+        json_schema: dict | None = None,
+        use_cache: bool = True,
+        validate: Callable[[str], bool] | None = None,
+    ) -> list[str]:
+        """Request ``n`` completions of one prompt in a single call (see WolverineClient.chat_samples)."""
+        cache_key, cached = self._lookup(system_prompt, user_prompt, json_schema, use_cache, n)
+        if cached is not None:
+            return json.loads(cached)
+
+        async with self._limiter.slot():
+            completion = await self._router.acreate(
+                on_error=self._limiter.record_error, **self._request_kwargs(system_prompt, user_prompt, json_schema, n)
+            )
+        return self._finish_samples(completion, cache_key, validate)
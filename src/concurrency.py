@@ -0,0 +1,139 @@
+"""Feedback-driven limit on in-flight LLM requests (AIMD on latency and errors)."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+import openai
+
+# Errors that mean the server is overloaded rather than the request being wrong; an overloaded
+# vLLM also refuses or resets connections and times out (APIConnectionError includes APITimeoutError)
+OVERLOAD_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,
+)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class ConcurrencyLimiter:
+    """Cap on concurrent requests that, when ``adaptive``, tunes itself with AIMD.
+
+    Every ``window`` completed requests the limiter looks at the p95 latency of
+    that window. If the window saw overload errors (429, 5xx, timeouts, refused
+    connections; reported per attempt through ``record_error``) or the
+    p95 rose above ``latency_tolerance`` times the best p95 seen so far, the
+    limit is multiplied by ``backoff``; otherwise, if the limit was actually
+    reached, it grows by one. The baseline p95 slowly drifts up so one lucky
+    window does not pin the limit down forever.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        *,
+        adaptive: bool = False,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        window: int = 20,
+        latency_tolerance: float = 1.5,
+        backoff: float = 0.7,
+    ):
+        self._limit = max(min_limit, min(limit, max_limit)) if adaptive else limit
+        self._adaptive = adaptive
+        self._min_limit = min_limit
+        self._max_limit = max_limit if adaptive else limit
+        self._window = window
+        self._latency_tolerance = latency_tolerance
+        self._backoff = backoff
+
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._latencies: list[float] = []
+        self._window_errors = 0
+        self._saturated = False
+        self._baseline_p95: float | None = None
+        self._last_p95: float | None = None
+        self.increases = 0
+        self.decreases = 0
+        self.overload_errors = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def max_limit(self) -> int:
+        return self._max_limit
+
+    def record_error(self, error: BaseException) -> None:
+        """Count one failed attempt; pass it every retried failure, not only the final one."""
+        if isinstance(error, OVERLOAD_ERRORS):
+            self.overload_errors += 1
+            self._window_errors += 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one request slot for the duration of the block, recording its latency.
+
+        Errors are not seen here: a request retried inside the block would only
+        surface its last one, so attempts are reported through ``record_error``.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self._limit)
+            self._in_flight += 1
+            if self._in_flight >= self._limit:
+                self._saturated = True
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._record(time.monotonic() - start)
+                self._condition.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "adaptive": self._adaptive,
+            "limit": self._limit,
+            "min_limit": self._min_limit,
+            "max_limit": self._max_limit,
+            "in_flight": self._in_flight,
+            "last_p95_latency": round(self._last_p95, 3) if self._last_p95 is not None else None,
+            "baseline_p95_latency": round(self._baseline_p95, 3) if self._baseline_p95 is not None else None,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "overload_errors": self.overload_errors,
+        }
+
+    def _record(self, latency: float) -> None:
+        if not self._adaptive:
+            return
+        self._latencies.append(latency)
+        if len(self._latencies) < self._window:
+            return
+
+        p95 = _percentile(self._latencies, 95)
+        self._last_p95 = p95
+        if self._baseline_p95 is None or p95 < self._baseline_p95:
+            self._baseline_p95 = p95
+        else:
+            self._baseline_p95 *= 1.01
+
+        if self._window_errors or p95 > self._baseline_p95 * self._latency_tolerance:
+            new_limit = max(self._min_limit, int(self._limit * self._backoff))
+            if new_limit < self._limit:
+                self.decreases += 1
+                print(f"[INFO] Concurrency limit {self._limit} -> {new_limit} (p95 {p95:.2f}s, {self._window_errors} overload errors)")
+            self._limit = new_limit
+        elif self._saturated and self._limit < self._max_limit:
+            self._limit += 1
+            self.increases += 1
+
+        self._latencies = []
+        self._window_errors = 0
+        self._saturated = False
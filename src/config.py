@@ -1,12 +1,20 @@
 """Configuration for the MCP story evaluation server."""
 
 from dataclasses import dataclass
+from pathlib import Path
+
+# Project root is one level up from src/
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+DATASET_PATH = PROJECT_ROOT / "dataset" / "data.csv"
+RESULTS_DIR = PROJECT_ROOT / "dataset" / "results"
 
 @dataclass(frozen=True)
 class WolverineSettings:
     """Runtime configuration for the Wolverine OpenAI-compatible endpoint."""
 
     base_url: str = "http://localhost:8000/v1"  # vLLM Server Address
+    # Several vLLM replicas to load-balance across; empty means just base_url
+    endpoints: tuple[str, ...] = ()
     api_key: str = "EMPTY"
     model: str = "meta-llama/Llama-3.1-8B-Instruct"  # Model Name
     # meta-llama/Llama-3.1-8B-Instruct (이거만 돌리면 됨))
@@ -17,5 +25,36 @@ class WolverineSettings:
     # Qwen/Qwen2.5-7B-Instruct
 
     temperature: float = 0.7
+    max_concurrency: int = 32  # In-flight requests for the async engine (starting point when adaptive)
+    adaptive_concurrency: bool = True  # Tune the in-flight limit from observed latency / overload errors
+    min_concurrency: int = 2
+    max_concurrency_limit: int = 256
+    structured_output: bool = False  # Send JSON schemas for vLLM guided decoding
+    prompt_version: str = "2"  # Prompt set from prompts.PROMPT_SETS; recorded in every result row
+    samples: int = 1  # Self-consistency: completions per scoring call (OpenAI n); >1 adds std columns
+
+    # HTTP connection pooling, timeouts, retries and endpoint health checks
+    connect_timeout: float = 10.0
+    request_timeout: float = 600.0
+    max_retries: int = 3
+    retry_backoff: float = 0.5  # Seconds, doubled per retry
+    max_connections_per_endpoint: int = 64
+    unhealthy_after_failures: int = 3
+    health_check_interval: float = 30.0
+
+    # On-disk LLM response cache
+    cache_enabled: bool = True
+    cache_path: str = str(PROJECT_ROOT / "dataset" / "llm_cache.sqlite")
+    cache_max_entries: int = 200_000
+
+    # Per-story results reused by incremental runs
+    result_store_path: str = str(PROJECT_ROOT / "dataset" / "result_store.sqlite")
+
+    # Background evaluation jobs (start_evaluation_job)
+    max_running_jobs: int = 1  # Further jobs wait in the queue
+    job_max_row_errors: int = 50  # A job fails once more rows than this have errored
+
+    # Stories accepted by one evaluate_batch call; larger sets belong in a dataset job
+    max_batch_stories: int = 500
 
 WOLVERINE_SETTINGS = WolverineSettings()
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Random access to the story dataset CSV without loading it into memory."""
+
+import csv
+import io
+import os
+from array import array
+from collections.abc import Iterator
+
+INDEX_SUFFIX = ".idx"
+_INDEX_MAGIC = b"SEIDX1"
+
+
+class IndexedCSVDataset:
+    """CSV rows served by byte offset.
+
+    The first open scans the file once and records where every record starts
+    (quoted fields may span lines); the offsets are stored next to the CSV in
+    ``<path>.idx`` and reused while the CSV's size and mtime are unchanged.
+    ``dataset[i]`` is then a single seek + read, and ``iter_rows`` streams
+    records without materializing the whole file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        # utf-8-sig drops the BOM spreadsheet exports put before the first column name
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            self.columns = next(csv.reader(f), [])
+        self._offsets = self._load_index() or self._build_index()
+
+    def __len__(self) -> int:
+        # The final offset marks the end of the last record
+        return max(len(self._offsets) - 1, 0)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def __getitem__(self, index: int) -> dict[str, str]:
+        if index < 0 or index >= len(self):
+            raise IndexError(f"Index {index} out of range for {len(self)} entries")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            raw = f.read(end - start)
+        values = next(csv.reader(io.StringIO(raw.decode("utf-8"), newline="")))
+        return dict(zip(self.columns, values))
+
+    def iter_rows(self, start: int = 0) -> Iterator[tuple[int, dict[str, str]]]:
+        """Yield (index, row) pairs from ``start`` onwards, reading the file sequentially."""
+        if start >= len(self):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[start])
+            text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+            reader = csv.DictReader(text, fieldnames=self.columns)
+            for index, row in enumerate(reader, start=start):
+                yield index, row
+
+    def _signature(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_index(self) -> array | None:
+        try:
+            with open(self.index_path, "rb") as f:
+                if f.read(len(_INDEX_MAGIC)) != _INDEX_MAGIC:
+                    return None
+                signature = array("q")
+                signature.fromfile(f, 2)
+                if tuple(signature) != self._signature():
+                    return None
+                offsets = array("q")
+                offsets.frombytes(f.read())
+                return offsets
+        except (OSError, EOFError, ValueError):
+            return None
+
+    def _build_index(self) -> array:
+        offsets = array("q")
+        with open(self.path, "rb") as f:
+            in_quotes = False
+            header_done = False
+            position = 0
+            # A BOM is part of the header line, so record offsets stay exact byte positions
+            for line in f:
+                if not in_quotes and header_done and line.strip():
+                    offsets.append(position)
+                position += len(line)
+                # An odd number of quotes toggles whether we are inside a quoted field
+                if line.count(b'"') % 2:
+                    in_quotes = not in_quotes
+                if not in_quotes:
+                    header_done = True
+            offsets.append(position)
+
+        try:
+            with open(self.index_path, "wb") as f:
+                f.write(_INDEX_MAGIC)
+                array("q", self._signature()).tofile(f)
+                offsets.tofile(f)
+        except OSError as e:
+            print(f"[WARNING] Could not write dataset index {self.index_path}: {e}")
+        print(f"[INFO] Built dataset index: {len(offsets) - 1} entries from {self.path}")
+        return offsets
@@ -0,0 +1,332 @@
+"""Async evaluation engine that runs many dataset rows concurrently against vLLM."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TypeVar
+from evaluation import AsyncStoryEvaluator, StoryEvaluation, STORY_EVALUATION_CATEGORIES
+from result_store import ResultStore
+
+# Columns of the result CSV, in the order written by evaluate_full_dataset
+RESULT_COLUMNS = (
+    ["index", "model"]
+    + [f"{category}_score" for category in STORY_EVALUATION_CATEGORIES]
+    + [
+        "creativity_standalone_score",
+        "creativity_contextual_score",
+        "creativity_difference",
+        "influential_categories",
+        "prompt_version",
+    ]
+)
+
+# Self-consistency runs (samples > 1) add the standard deviation of every sampled score
+SAMPLED_RESULT_COLUMNS = (
+    RESULT_COLUMNS
+    + [f"{category}_std" for category in STORY_EVALUATION_CATEGORIES]
+    + ["creativity_standalone_std", "creativity_contextual_std"]
+)
+
+# Scores a result row needs before incremental runs may reuse it
+REQUIRED_SCORE_COLUMNS = [f"{category}_score" for category in STORY_EVALUATION_CATEGORIES] + [
+    "creativity_standalone_score",
+    "creativity_contextual_score",
+]
+
+RowResult = TypeVar("RowResult")
+
+# How many rows (relative to max_active_rows) may be in flight or waiting to be emitted in order
+REORDER_WINDOW_FACTOR = 4
+
+# Row errors kept for a run summary (the count is always exact)
+MAX_REPORTED_ROW_ERRORS = 20
+
+
+def result_columns(samples: int) -> list[str]:
+    """Result CSV columns for an evaluator drawing ``samples`` completions per scoring call."""
+    return SAMPLED_RESULT_COLUMNS if samples > 1 else RESULT_COLUMNS
+
+
+def build_result_row(index: int, model: str, evaluation: StoryEvaluation) -> dict:
+    """Flatten the evaluation of a single story into one result CSV row."""
+    standalone_creativity = evaluation.standalone_creativity
+    contextual_creativity = evaluation.results.get("Creativity", standalone_creativity)
+
+    result_row = {
+        "index": index,
+        "model": model,
+    }
+
+    # Add all category scores (only scores, no explanations)
+    for category, result in evaluation.results.items():
+        if category != "Creativity":  # Creativity is handled separately
+            result_row[f"{category}_score"] = result.score
+            if result.std is not None:
+                result_row[f"{category}_std"] = result.std
+
+    # Add both creativity scores
+    result_row["creativity_standalone_score"] = standalone_creativity.score
+    result_row["creativity_contextual_score"] = contextual_creativity.score
+    if standalone_creativity.score is not None and contextual_creativity.score is not None:
+        result_row["creativity_difference"] = round(abs(standalone_creativity.score - contextual_creativity.score), 1)
+    else:
+        result_row["creativity_difference"] = None
+    if standalone_creativity.std is not None:
+        result_row["creativity_standalone_std"] = standalone_creativity.std
+    if contextual_creativity.std is not None:
+        result_row["creativity_contextual_std"] = contextual_creativity.std
+
+    # Add analysis results (influential categories)
+    influential_categories = evaluation.analysis.get("influential_categories", [])
+    result_row["influential_categories"] = ", ".join(influential_categories) if influential_categories else ""
+    result_row["prompt_version"] = evaluation.prompt_version
+
+    return result_row
+
+
+def is_fully_scored(result_row: dict) -> bool:
+    """True when every category and both creativity scores were parsed (no None from a failed or unreadable reply)."""
+    return all(result_row.get(column) is not None for column in REQUIRED_SCORE_COLUMNS)
+
+
+def story_row_evaluator(evaluator: AsyncStoryEvaluator) -> Callable[[int, str, str], Awaitable[dict]]:
+    """Return a row coroutine that runs the full per-story pipeline and flattens it into a result row."""
+
+    async def evaluate_row(index: int, model: str, story: str) -> dict:
+        evaluation = await evaluator.evaluate_story_full(story)
+        return build_result_row(index, model, evaluation)
+
+    return evaluate_row
+
+
+class ResultStoreUsage:
+    """Result store lookups of one run; the store itself is shared by every run of the process."""
+
+    def __init__(self, store: ResultStore):
+        self.store = store
+        self.reused = 0
+        self.missing = 0
+        self.evaluated = 0
+        self.not_stored = 0
+
+    def to_dict(self) -> dict:
+        return {
+            **self.store.stats(),
+            "reused": self.reused,
+            "missing": self.missing,
+            "evaluated": self.evaluated,
+            "not_stored": self.not_stored,
+        }
+
+
+def incremental_row_evaluator(evaluator: AsyncStoryEvaluator, usage: ResultStoreUsage) -> Callable[[int, str, str], Awaitable[dict]]:
+    """Like ``story_row_evaluator``, but only evaluate stories not yet in ``usage.store``.
+
+    Stories are keyed by their text, the evaluator model, prompt and parser
+    version, temperature and structured output (and the sample count in
+    self-consistency mode), so stored results are
+    reused for unchanged stories and identical stories under several rows are
+    evaluated once (concurrent duplicates wait for the first one). Lookups and
+    evaluations are counted on ``usage``. Like the response cache, the store only
+    keeps complete results: a row with an unscored category or creativity score
+    is written to the run's output but asked again by the next run.
+    """
+    store = usage.store
+    evaluator_model = evaluator.client.model
+    prompt_version = evaluator.prompt_version
+    in_flight: dict[str, asyncio.Task] = {}
+
+    async def evaluate_and_store(key: str, story: str) -> dict:
+        try:
+            result_row = build_result_row(0, "", await evaluator.evaluate_story_full(story))
+            del result_row["index"], result_row["model"]
+            usage.evaluated += 1
+            if is_fully_scored(result_row):
+                store.put(key, result_row, evaluator_model=evaluator_model, prompt_version=prompt_version)
+            else:
+                usage.not_stored += 1
+            return result_row
+        finally:
+            in_flight.pop(key, None)
+
+    async def evaluate_row(index: int, model: str, story: str) -> dict:
+        key = ResultStore.make_key(
+            story=story,
+            evaluator_model=evaluator_model,
+            prompt_version=prompt_version,
+            temperature=evaluator.client.temperature,
+            structured_output=evaluator.structured_output,
+            samples=evaluator.samples,
+        )
+        stored = store.get(key)
+        if stored is None:
+            usage.missing += 1
+            task = in_flight.get(key)
+            if task is None:
+                task = in_flight[key] = asyncio.create_task(evaluate_and_store(key, story))
+            stored = await task
+        else:
+            usage.reused += 1
+        return {"index": index, "model": model, **stored}
+
+    return evaluate_row
+
+
+
+class RowFailures:
+    """Rows of a run whose evaluation raised; they are not written, so a resumed run evaluates them again."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors: list[str] = []
+
+    def record(self, index: int, error: BaseException) -> None:
+        self.count += 1
+        if len(self.errors) < MAX_REPORTED_ROW_ERRORS:
+            self.errors.append(f"row {index}: {type(error).__name__}: {error}")
+
+    def to_dict(self) -> dict:
+        return {"rows_failed": self.count, "row_errors": list(self.errors)}
+
+
+def skip_failed_rows(
+    evaluate_row: Callable[[int, str, str], Awaitable[RowResult]], failures: RowFailures
+) -> Callable[[int, str, str], Awaitable[RowResult | None]]:
+    """Wrap a row coroutine so a failed row is recorded in ``failures`` and yields None instead of ending the run."""
+
+    async def evaluate(index: int, model: str, story: str) -> RowResult | None:
+        try:
+            return await evaluate_row(index, model, story)
+        except Exception as e:
+            failures.record(index, e)
+            print(f"[WARNING] Row {index} failed: {e}")
+            return None
+
+    return evaluate
+
+# What evaluate_story_batch runs per story, named after the single-story MCP tools
+BATCH_MODES = ("creativity", "all_categories", "full")
+
+
+async def evaluate_story_batch(evaluator: AsyncStoryEvaluator, stories: list[str], mode: str) -> list[dict]:
+    """Evaluate a list of stories concurrently and return one item per story, in input order.
+
+    Identical stories are evaluated once; later copies carry ``duplicate_of``
+    with the position of the first. Every story is started at once and the
+    client's concurrency limit decides how many LLM requests are in flight, so
+    vLLM can batch them. A story that fails gets an ``error`` item instead of
+    ending the batch.
+    """
+    if mode == "creativity":
+        async def evaluate(story: str):
+            return (await evaluator.evaluate_creativity(story)).to_dict()
+    elif mode == "all_categories":
+        async def evaluate(story: str):
+            results = await evaluator.evaluate_all_categories(story)
+            return {cat: res.to_dict() for cat, res in results.items()}
+    elif mode == "full":
+        async def evaluate(story: str):
+            return (await evaluator.evaluate_story_full(story)).to_dict()
+    else:
+        raise ValueError(f"Unknown mode {mode!r}; use one of {', '.join(BATCH_MODES)}")
+
+    first_positions: dict[str, int] = {}
+    for position, story in enumerate(stories):
+        first_positions.setdefault(story, position)
+
+    async def run(story: str) -> dict:
+        if not story.strip():
+            return {"error": "Story is empty"}
+        try:
+            return {"result": await evaluate(story)}
+        except Exception as e:
+            print(f"[WARNING] Batch story failed: {e}")
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    unique = list(first_positions)
+    outcomes = dict(zip(unique, await asyncio.gather(*(run(story) for story in unique))))
+    items = []
+    for position, story in enumerate(stories):
+        item = {"index": position, **outcomes[story]}
+        if first_positions[story] != position:
+            item["duplicate_of"] = first_positions[story]
+        items.append(item)
+    return items
+
+
+async def evaluate_rows(
+    evaluate_row: Callable[[int, str, str], Awaitable[RowResult]],
+    rows: Iterable[tuple[int, str, str]],
+    max_active_rows: int | Callable[[], int],
+    on_result: Callable[[RowResult], None],
+) -> int:
+    """Evaluate (index, model, story) rows concurrently, emitting results in input order.
+
+    ``evaluate_row`` turns one row into a result (see ``story_row_evaluator``)
+    and rows are pulled from ``rows`` lazily. The client caps the number of
+    in-flight requests; ``max_active_rows`` caps how many stories are being
+    worked on at once, and finished rows wait in a bounded reorder buffer until
+    every earlier row has been passed to ``on_result``. Pass a callable (e.g.
+    the client's current concurrency limit) to have the cap follow it as an
+    adaptive limit grows or shrinks; it is re-read before each row starts. A None result (a row
+    skipped by ``skip_failed_rows``) keeps its place in the order but is not
+    passed on. An exception from ``evaluate_row`` ends the run. Returns the
+    number of rows evaluated.
+    """
+    active_limit = max_active_rows if callable(max_active_rows) else lambda: max_active_rows
+    # Rows may start while both the active rows and the active + finished-but-unemitted rows
+    # (bounded so one slow story cannot grow the buffer forever) are below their caps
+    changed = asyncio.Condition()
+    active = 0
+    buffered = 0
+    finished: dict[int, RowResult | None] = {}
+    errors: list[BaseException] = []
+    next_position = 0
+    completed = 0
+
+    def may_start() -> bool:
+        limit = max(1, active_limit())
+        return bool(errors) or (active < limit and buffered < limit * REORDER_WINDOW_FACTOR)
+
+    async def run(position: int, index: int, model: str, story: str) -> None:
+        nonlocal active, buffered, next_position, completed
+        try:
+            try:
+                finished[position] = result = await evaluate_row(index, model, story)
+            finally:
+                active -= 1
+            if result is not None:
+                completed += 1
+                print(f"[INFO] Evaluated entry {index + 1} ({completed} done)")
+
+            # Emit every row that is now contiguous with what was already written
+            while next_position in finished:
+                result = finished.pop(next_position)
+                if result is not None:
+                    on_result(result)
+                next_position += 1
+                buffered -= 1
+        except Exception as e:
+            errors.append(e)  # Lets the producer notice the failure
+        async with changed:
+            changed.notify_all()
+
+    tasks: set[asyncio.Task] = set()
+    try:
+        for position, (index, model, story) in enumerate(rows):
+            async with changed:
+                await changed.wait_for(may_start)
+            if errors:
+                break
+            active += 1
+            buffered += 1
+            task = asyncio.create_task(run(position, index, model, story))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    if errors:
+        raise errors[0]
+    return completed
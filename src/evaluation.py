@@ -1,60 +1,103 @@
-import json
-import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from clients import WolverineClient
-
-EVALUATION_SYSTEM_PROMPT = (
-    "You are a literary critic. Always respond with JSON containing the key "
-    '"score" (a number from 0.0 to 20.0, can include one decimal place like 15.5).'
+from statistics import fmean, pstdev
+from typing import TYPE_CHECKING
+from config import WOLVERINE_SETTINGS
+# Category definitions live in categories.py and are re-exported here
+from categories import (
+    CATEGORY_TYPES,
+    NEGATIVE_CATEGORIES,
+    POSITIVE_CATEGORIES,
+    STORY_EVALUATION_CATEGORIES,
+    is_negative_category,
+    is_positive_category,
+)
+from metrics import (
+    COMBINED_SCORING,
+    CONTEXTUAL_CREATIVITY,
+    DIFFERENCE_ANALYSIS,
+    FALLBACK_REPAIR,
+    METRICS,
+    STANDALONE_CREATIVITY,
+    track_stage,
+)
+# Reply parsers live in parsing.py and are re-exported here
+from parsing import (
+    clamp_score,
+    parse_combined_response,
+    parse_combined_samples,
+    parse_influential_categories,
+    parse_response,
+    parse_score_samples,
 )
+from prompts import ChatPrompt, get_prompt_set
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing clients pulls in openai/httpx
+    from clients import AsyncWolverineClient, WolverineClient
+
+######## Structured Output Schemas ########
+# JSON schemas used for guided decoding when structured output is enabled
+def build_scores_schema(categories: list[str]) -> dict:
+    """JSON schema for a 'scores' object with exactly the given categories."""
+    return {
+        "title": "category_scores",
+        "type": "object",
+        "properties": {
+            "scores": {
+                "type": "object",
+                "properties": {
+                    cat: {"type": "number", "minimum": 0, "maximum": 20}
+                    for cat in categories
+                },
+                "required": list(categories),
+                "additionalProperties": False,
+            },
+        },
+        "required": ["scores"],
+        "additionalProperties": False,
+    }
+
+SCORES_SCHEMA = build_scores_schema(STORY_EVALUATION_CATEGORIES)
 
-# Positive metrics: Higher is Better (0-20 scale)
-POSITIVE_CATEGORIES = [
-    "Adherence to Instructions",
-    "Believable Character Actions",
-    "Nuanced Characters",
-    "Consistent Voice / Tone of Writing",
-    "Imagery and Descriptive Quality",
-    "Elegant Prose",
-    "Emotionally Engaging",
-    "Emotionally Complex",
-    "Coherent",
-    "Well-earned Lightness or Darkness",
-    "Sentences Flow Naturally",
-    "Overall Reader Engagement",
-    "Overall Impression",
-]
-
-# Negative / Penalty metrics: Lower is Better (0-20 scale, lower scores indicate less of the problem)
-NEGATIVE_CATEGORIES = [
-    "Meandering",
-    "Weak Dialogue",
-    "Tell-Don't-Show",
-    "Unsurprising or Uncreative",
-    "Amateurish",
-    "Purple Prose",
-    "Overwrought",
-    "Incongruent Ending Positivity",
-    "Unearned Transformations",
-]
-
-STORY_EVALUATION_CATEGORIES = POSITIVE_CATEGORIES + NEGATIVE_CATEGORIES
-
-CATEGORY_TYPES = {cat: "positive" for cat in POSITIVE_CATEGORIES}
-CATEGORY_TYPES.update({cat: "negative" for cat in NEGATIVE_CATEGORIES})
-
-def is_positive_category(category: str) -> bool:
-    """Check if a category is a positive metric (higher is better)."""
-    return CATEGORY_TYPES.get(category) == "positive"
-
-def is_negative_category(category: str) -> bool:
-    """Check if a category is a negative/penalty metric (lower is better)."""
-    return CATEGORY_TYPES.get(category) == "negative"
-
-def build_user_prompt(story: str, category: str) -> str:
-    """Build the user prompt sent to the model."""
-    return f"Evaluate the following story focusing strictly on the category: {category}.\n\nStory:\n{story}"
+SCORE_SCHEMA = {
+    "title": "score",
+    "type": "object",
+    "properties": {"score": {"type": "number", "minimum": 0, "maximum": 20}},
+    "required": ["score"],
+    "additionalProperties": False,
+}
 
+ANALYSIS_SCHEMA = {
+    "title": "creativity_difference_analysis",
+    "type": "object",
+    "properties": {
+        "influential_categories": {
+            "type": "array",
+            "items": {"type": "string", "enum": STORY_EVALUATION_CATEGORIES},
+        },
+    },
+    "required": ["influential_categories"],
+    "additionalProperties": False,
+}
+
+######## Reply Validation ########
+# Only replies that parse are cached, so a broken reply is asked again by the next run instead of replayed
+def _has_score(reply: str) -> bool:
+    return parse_response(reply) is not None
+
+def _has_scores(categories: list[str]):
+    """Validator accepting a 'scores' reply only when it holds every one of ``categories``."""
+    def validate(reply: str) -> bool:
+        scores = parse_combined_response(reply)
+        return all(cat in scores for cat in categories)
+    return validate
+
+_has_all_scores = _has_scores(STORY_EVALUATION_CATEGORIES)
+
+def _has_influential_categories(reply: str) -> bool:
+    return bool(parse_influential_categories(reply))
 
 ######## Data Classes ########
 @dataclass
@@ -62,268 +105,354 @@ class EvaluationResult:
     """Evaluation Response for a single category."""
 
     category: str
-    score: float
+    score: float | None  # None when the model never produced a usable score; the mean when sampled
+    std: float | None = None  # Set in self-consistency mode (samples > 1)
+    samples: list[float] | None = None
 
     def to_dict(self) -> dict:
-        return {
+        result = {
             "category": self.category,
             "score": self.score,
         }
+        if self.samples is not None:
+            result["std"] = self.std
+            result["samples"] = self.samples
+        return result
+
+
+@dataclass
+class StoryEvaluation:
+    """Full evaluation of a single story: both creativity scores, all categories and the difference analysis."""
+
+    standalone_creativity: EvaluationResult
+    results: dict[str, EvaluationResult]  # All categories plus contextual "Creativity"
+    analysis: dict
+    prompt_version: str = ""  # Version of the prompt set that produced the scores
+
+    def to_dict(self) -> dict:
+        return {
+            "standalone_creativity": self.standalone_creativity.to_dict(),
+            "categories": {cat: res.to_dict() for cat, res in self.results.items()},
+            "analysis": self.analysis,
+            "prompt_version": self.prompt_version,
+        }
     
 ##### Story Evaluator (Main) ########
-class StoryEvaluator:
-    """Evaluate stories for multiple literary categories."""
+# Runs the standalone creativity call next to the category scoring; shared by every sync evaluator
+_PIPELINE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="story-evaluator")
+
+class _StoryEvaluatorBase:
+    """Prompts, reply parsing and result building shared by the sync and async evaluators.
+
+    Subclasses only make the LLM calls; every step between two calls lives here.
+    """
+
+    def __init__(
+        self,
+        client,
+        structured_output: bool | None = None,
+        samples: int | None = None,
+        prompt_version: str | None = None,
+    ):
+        """Initialize the evaluator with a Wolverine client.
 
-    def __init__(self, client: WolverineClient):
-        """Initialize the evaluator with a Wolverine client."""
+        With ``structured_output`` every call sends a JSON schema for guided
+        decoding (defaults to ``WOLVERINE_SETTINGS.structured_output``). With
+        ``samples`` > 1 each scoring call asks for that many completions in one
+        request and scores become their mean, with std and raw samples
+        (defaults to ``WOLVERINE_SETTINGS.samples``). ``prompt_version`` picks
+        the prompt set from prompts.PROMPT_SETS.
+        """
         self._client = client
+        self._structured_output = WOLVERINE_SETTINGS.structured_output if structured_output is None else structured_output
+        self._samples = max(1, WOLVERINE_SETTINGS.samples if samples is None else samples)
+        self._prompts = get_prompt_set(prompt_version)
+        self.combined_calls = 0
+        self.fallback_events = 0
+        self.unscored_categories = 0
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    @property
+    def prompt_version(self) -> str:
+        return self._prompts.version
+
+    @property
+    def structured_output(self) -> bool:
+        return self._structured_output
+
+    def stats(self) -> dict:
+        """Return how often the combined scoring reply needed a repair call and how many categories stayed unscored."""
+        return {
+            "structured_output": self._structured_output,
+            "samples": self._samples,
+            "prompt_version": self._prompts.version,
+            "combined_calls": self.combined_calls,
+            "fallback_events": self.fallback_events,
+            "unscored_categories": self.unscored_categories,
+        }
+
+    def _chat_kwargs(self, prompt: ChatPrompt, json_schema: dict, validate) -> dict:
+        """Keyword arguments of a client call; the schema is only sent with structured output."""
+        return {
+            "system_prompt": prompt.system,
+            "user_prompt": prompt.user,
+            "json_schema": json_schema if self._structured_output else None,
+            "validate": validate,
+        }
+
+    # Requests: (prompt, schema, validator) of each scoring call
+    def _scores_request(self, story: str) -> tuple:
+        return self._prompts.scores(story), SCORES_SCHEMA, _has_all_scores
+
+    def _repair_request(self, story: str, missing: list[str]) -> tuple:
+        # Repair: re-ask only the categories we could not salvage
+        self.fallback_events += 1
+        print(f"[WARNING] Combined evaluation missing {len(missing)} categories, re-asking only those")
+        return self._prompts.repair(story, missing), build_scores_schema(missing), _has_scores(missing)
+
+    def _contextual_request(self, story: str, results: dict[str, "EvaluationResult"]) -> tuple:
+        return self._prompts.contextual(story, results), SCORE_SCHEMA, _has_score
+
+    def _creativity_request(self, story: str) -> tuple:
+        return self._prompts.creativity(story), SCORE_SCHEMA, _has_score
+
+    def _analysis_request(
+        self, story: str, standalone_creativity: "EvaluationResult", results: dict[str, "EvaluationResult"]
+    ) -> tuple | None:
+        """Request of the difference analysis, or None when the two creativity scores agree."""
+        standalone_score, contextual_score = _creativity_scores(standalone_creativity, results)
+        # Nothing to explain if a score is missing or both are the same (within 0.1 tolerance)
+        if standalone_score is None or contextual_score is None or abs(standalone_score - contextual_score) < 0.1:
+            return None
+        prompt = self._prompts.analysis(story, standalone_score, contextual_score, results)
+        return prompt, ANALYSIS_SCHEMA, _has_influential_categories
+
+    # Parsing of the replies
+    def _parse_scores(self, responses: list[str]) -> tuple[dict[str, list[float]], list[str]]:
+        """Parse the combined scoring replies into (scores, categories still missing)."""
+        self.combined_calls += 1
+        scores = parse_combined_samples(responses)
+        missing = [cat for cat in STORY_EVALUATION_CATEGORIES if cat not in scores]
+        if missing:
+            METRICS.record_parse_failure()
+        return scores, missing
+
+    def _merge_repair(self, scores: dict[str, list[float]], missing: list[str], responses: list[str]) -> None:
+        scores.update(parse_combined_samples(responses))
+        if any(cat not in scores for cat in missing):
+            METRICS.record_parse_failure()
+
+    def _build_category_results(self, scores: dict[str, list[float]]) -> dict[str, "EvaluationResult"]:
+        results = {
+            cat: aggregate_samples(cat, scores.get(cat, []), self._samples > 1) for cat in STORY_EVALUATION_CATEGORIES
+        }
+        unscored = [cat for cat, res in results.items() if res.score is None]
+        if unscored:
+            self.unscored_categories += len(unscored)
+            print(f"[WARNING] Leaving {len(unscored)} categories unscored: {', '.join(unscored)}")
+        return results
+
+    def _creativity_result(self, responses: list[str]) -> "EvaluationResult":
+        return _score_result(responses, self._samples > 1)
+
+    def _analysis_result(
+        self, standalone_creativity: "EvaluationResult", results: dict[str, "EvaluationResult"], response: str | None
+    ) -> dict:
+        """Difference analysis from the analysis reply (None when no analysis call was needed)."""
+        standalone_score, contextual_score = _creativity_scores(standalone_creativity, results)
+        influential_categories = []
+        if response is not None:
+            influential_categories = parse_influential_categories(response)
+            if not influential_categories:
+                METRICS.record_parse_failure()
+        return build_analysis_result(standalone_score, contextual_score, influential_categories)
+
+
+class StoryEvaluator(_StoryEvaluatorBase):
+    """Evaluate stories for multiple literary categories."""
+
+    @property
+    def client(self) -> "WolverineClient":
+        return self._client
+
+    def _sample(self, request: tuple) -> list[str]:
+        """One reply, or ``samples`` replies from a single n-completion request."""
+        kwargs = self._chat_kwargs(*request)
+        if self._samples == 1:
+            return [self._client.chat(**kwargs)]
+        return self._client.chat_samples(n=self._samples, **kwargs)
+
+    def evaluate_story_full(self, story: str) -> StoryEvaluation:
+        """Run the full per-story pipeline, starting independent LLM calls together.
+
+        Standalone creativity and the combined category scoring do not depend on
+        each other, so they run in parallel; contextual creativity waits for the
+        scores and the difference analysis waits for both creativity scores.
+        """
+        standalone_future = _PIPELINE_EXECUTOR.submit(self.evaluate_creativity, story)
+        results = self.score_categories(story)
+        results["Creativity"] = self.evaluate_contextual_creativity(story, results)
+        standalone_creativity = standalone_future.result()
+        analysis = self.analyze_creativity_difference(story, standalone_creativity, results)
+        return StoryEvaluation(standalone_creativity, results, analysis, self._prompts.version)
 
     def evaluate_all_categories(self, story: str) -> dict[str, EvaluationResult]:
         """Evaluate a story across all categories in a single LLM call, then evaluate creativity. Much faster than individual calls."""
-        # Build category list with type indicators
-        positive_list = "\n".join([f"  - {cat} (POSITIVE: higher is better)" for cat in POSITIVE_CATEGORIES])
-        negative_list = "\n".join([f"  - {cat} (NEGATIVE/PENALTY: lower is better)" for cat in NEGATIVE_CATEGORIES])
-        
-        combined_prompt = (
-            f"Evaluate the following story across all these categories. "
-            f"For each category, provide a score from 0.0 to 20.0 (can include one decimal place like 15.5).\n\n"
-            f"POSITIVE METRICS (Higher scores are better):\n{positive_list}\n\n"
-            f"NEGATIVE/PENALTY METRICS (Lower scores are better - score how much this problem exists):\n{negative_list}\n\n"
-            f"For positive metrics: higher scores indicate better quality.\n"
-            f"For negative metrics: lower scores indicate less of the problem (i.e., better quality).\n\n"
-            f"Respond with JSON containing a 'scores' object where each key is the category name and the value is the score (number 0.0-20.0).\n"
-            f"Example format: {{\"scores\": {{\"Adherence to Instructions\": 16.5, \"Meandering\": 4.0, ...}}}}\n\n"
-            f"Story:\n{story}"
-        )
-        
-        # Single LLM call for all categories
-        response = self._client.chat(
-            system_prompt="You are a literary critic. Always respond with valid JSON containing a 'scores' object with category names as keys and numeric scores (0.0-20.0) as values. Remember: positive metrics should have higher scores, negative/penalty metrics should have lower scores.",
-            user_prompt=combined_prompt,
-        )
-        
-        # Parse the response
-        results = {}
-        try:
-            # Remove markdown code blocks if present
-            cleaned_response = response.strip()
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]  # Remove ```json
-            if cleaned_response.startswith("```"):
-                cleaned_response = cleaned_response[3:]  # Remove ```
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]  # Remove closing ```
-            cleaned_response = cleaned_response.strip()
-            
-            payload = json.loads(cleaned_response)
-            scores = payload.get("scores", {})
-            
-            # Create EvaluationResult for each category
-            for category in STORY_EVALUATION_CATEGORIES:
-                score = scores.get(category)
-                if score is None:
-                    # Try to find by partial match (remove suffixes like " (POSITIVE)" from keys)
-                    for key, value in scores.items():
-                        # Remove common suffixes from response keys
-                        cleaned_key = key.replace(" (POSITIVE)", "").replace(" (NEGATIVE/PENALTY)", "").strip()
-                        if category.lower() == cleaned_key.lower() or category.lower() in cleaned_key.lower() or cleaned_key.lower() in category.lower():
-                            score = value
-                            break
-                
-                if score is None:
-                    score = 0.0
-                else:
-                    try:
-                        score = float(score)
-                        # Clamp score to 0-20 range
-                        if score < 0:
-                            score = 0.0
-                        elif score > 20:
-                            score = 20.0
-                    except (ValueError, TypeError):
-                        score = 0.0
-                
-                results[category] = EvaluationResult(
-                    category=category,
-                    score=score,
-                )
-        except json.JSONDecodeError:
-            # Fallback: if JSON parsing fails, try to extract scores individually
-            print(f"[WARNING] Failed to parse combined evaluation, falling back to individual calls")
-            for category in STORY_EVALUATION_CATEGORIES:
-                user_prompt = build_user_prompt(story, category)
-                response = self._client.chat(
-                    system_prompt=EVALUATION_SYSTEM_PROMPT,
-                    user_prompt=user_prompt,
-                )
-                score = parse_response(response)
-                if score is None:
-                    score = 0.0
-                else:
-                    # Clamp score to 0-20 range
-                    if score < 0:
-                        score = 0.0
-                    elif score > 20:
-                        score = 20.0
-                results[category] = EvaluationResult(
-                    category=category,
-                    score=score,
-                )
-        
-        # Evaluate creativity based on all category results
-        category_summary = "\n".join([
-            f"- {cat}: {res.score}/20"
-            for cat, res in results.items()
-        ])
-        creativity_prompt = (
-            f"Based on the following evaluation scores across all categories, "
-            f"what creativity score (0.0-20.0, can include one decimal place) would you give this story? "
-            f"Consider how the story demonstrates originality, innovation, unique perspectives, and imaginative elements.\n\n"
-            f"Evaluation Scores:\n{category_summary}\n\n"
-            f"Original Story:\n{story}\n\n"
-            f"Respond with JSON: {{\"score\": <number>}}"
-        )
-        creativity_response = self._client.chat(
-            system_prompt="You are a literary critic. Always respond with valid JSON containing 'score' (number 0.0-20.0).",
-            user_prompt=creativity_prompt,
-        )
-        creativity_score = parse_response(creativity_response)
-        if creativity_score is None:
-            creativity_score = 0.0
-        else:
-            # Clamp score to 0-20 range
-            if creativity_score < 0:
-                creativity_score = 0.0
-            elif creativity_score > 20:
-                creativity_score = 20.0
-        results["Creativity"] = EvaluationResult(
-            category="Creativity",
-            score=creativity_score,
-        )
-        
+        results = self.score_categories(story)
+        results["Creativity"] = self.evaluate_contextual_creativity(story, results)
         return results
 
+    def score_categories(self, story: str) -> dict[str, EvaluationResult]:
+        """Score every category in a single LLM call (without creativity).
+
+        Categories missing from the reply are re-asked in one batched repair
+        call; any still missing after that are left unscored (None).
+        """
+        with track_stage(COMBINED_SCORING):
+            scores, missing = self._parse_scores(self._sample(self._scores_request(story)))
+        if missing:
+            with track_stage(FALLBACK_REPAIR):
+                self._merge_repair(scores, missing, self._sample(self._repair_request(story, missing)))
+        return self._build_category_results(scores)
+
+    def evaluate_contextual_creativity(self, story: str, results: dict[str, EvaluationResult]) -> EvaluationResult:
+        """Evaluate creativity based on all category results."""
+        with track_stage(CONTEXTUAL_CREATIVITY):
+            return self._creativity_result(self._sample(self._contextual_request(story, results)))
+
     def evaluate_creativity(self, story: str) -> EvaluationResult:
         """Evaluate a story's creativity directly without breaking it into categories."""
-        user_prompt = f"Evaluate the creativity of the following story. Consider originality, innovation, unique perspectives, and imaginative elements.\n\nStory:\n{story}"
-        response = self._client.chat(
-            system_prompt=EVALUATION_SYSTEM_PROMPT,
-            user_prompt=user_prompt,
-        )
-        score = parse_response(response)
-        if score is None:
-            score = 0.0  # Default score if parsing fails
-        else:
-            # Clamp score to 0-20 range
-            if score < 0:
-                score = 0.0
-            elif score > 20:
-                score = 20.0
-        return EvaluationResult(
-            category="Creativity",
-            score=score,
-        )
+        with track_stage(STANDALONE_CREATIVITY):
+            return self._creativity_result(self._sample(self._creativity_request(story)))
 
     def analyze_creativity_difference(
-        self, 
+        self,
         story: str,
         standalone_creativity: EvaluationResult,
         all_categories_results: dict[str, EvaluationResult]
     ) -> dict:
         """Analyze which categories influenced the difference in creativity scores."""
-        standalone_score = standalone_creativity.score
-        contextual_score = all_categories_results.get("Creativity", standalone_creativity).score
-        
-        # If scores are the same (within 0.1 tolerance), return early
-        if abs(standalone_score - contextual_score) < 0.1:
-            return {
-                "standalone_creativity_score": standalone_score,
-                "contextual_creativity_score": contextual_score,
-                "difference": 0.0,
-                "influential_categories": []
-            }
-        
-        # Build category summary (excluding Creativity itself)
-        category_summary = "\n".join([
-            f"- {cat}: {res.score}/20"
-            for cat, res in all_categories_results.items()
-            if cat != "Creativity"
-        ])
-        
-        # List all available categories for reference with type indicators
-        positive_ref = "\n".join([f"- {cat} (POSITIVE)" for cat in POSITIVE_CATEGORIES])
-        negative_ref = "\n".join([f"- {cat} (NEGATIVE)" for cat in NEGATIVE_CATEGORIES])
-        available_categories = f"Positive Metrics:\n{positive_ref}\n\nNegative Metrics:\n{negative_ref}"
-        
-        analysis_prompt = (
-            f"Two different creativity scores were given for the same story:\n"
-            f"- Standalone creativity score (evaluated without category context): {standalone_score}/20\n"
-            f"- Contextual creativity score (evaluated after seeing all category results): {contextual_score}/20\n"
-            f"- Difference: {abs(standalone_score - contextual_score):.1f} points\n\n"
-            f"All category evaluation results:\n{category_summary}\n\n"
-            f"Original Story:\n{story}\n\n"
-            f"Available categories:\n{available_categories}\n\n"
-            f"Please identify which specific categories influenced the change in creativity score. "
-            f"You MUST only select from the categories listed above. Do not create new category names. "
-            f"Respond with JSON containing: "
-            f'"influential_categories" (list of category names from the available categories that most influenced the difference).'
-        )
-        
-        analysis_response = self._client.chat(
-            system_prompt="You are a literary analysis expert. Always respond with valid JSON.",
-            user_prompt=analysis_prompt,
+        request = self._analysis_request(story, standalone_creativity, all_categories_results)
+        if request is None:
+            return self._analysis_result(standalone_creativity, all_categories_results, None)
+        with track_stage(DIFFERENCE_ANALYSIS):
+            response = self._client.chat(**self._chat_kwargs(*request))
+            return self._analysis_result(standalone_creativity, all_categories_results, response)
+
+
+class AsyncStoryEvaluator(_StoryEvaluatorBase):
+    """Async counterpart of StoryEvaluator, used to evaluate many stories concurrently."""
+
+    @property
+    def client(self) -> "AsyncWolverineClient":
+        return self._client
+
+    async def _sample(self, request: tuple) -> list[str]:
+        """One reply, or ``samples`` replies from a single n-completion request."""
+        kwargs = self._chat_kwargs(*request)
+        if self._samples == 1:
+            return [await self._client.chat(**kwargs)]
+        return await self._client.chat_samples(n=self._samples, **kwargs)
+
+    async def evaluate_story_full(self, story: str) -> StoryEvaluation:
+        """Run the full per-story pipeline, starting independent LLM calls together."""
+
+        async def score_with_context() -> dict[str, EvaluationResult]:
+            results = await self.score_categories(story)
+            results["Creativity"] = await self.evaluate_contextual_creativity(story, results)
+            return results
+
+        standalone_creativity, results = await asyncio.gather(
+            self.evaluate_creativity(story),
+            score_with_context(),
         )
-        
-        # Parse the analysis response
-        try:
-            analysis_data = json.loads(analysis_response)
-            influential_categories = analysis_data.get("influential_categories", [])
-            
-            # Filter to only include valid categories from STORY_EVALUATION_CATEGORIES
-            valid_categories = [
-                cat for cat in influential_categories 
-                if cat in STORY_EVALUATION_CATEGORIES
-            ]
-            
-            return {
-                "standalone_creativity_score": standalone_score,
-                "contextual_creativity_score": contextual_score,
-                "difference": round(abs(standalone_score - contextual_score), 1),
-                "influential_categories": valid_categories
-            }
-        except json.JSONDecodeError:
-            # Fallback if JSON parsing fails
-            return {
-                "standalone_creativity_score": standalone_score,
-                "contextual_creativity_score": contextual_score,
-                "difference": round(abs(standalone_score - contextual_score), 1),
-                "influential_categories": []
-            }
-
-###### Response Parsing ########
-def parse_response(response: str) -> float | None:
-    """Parse the model's response into a numeric score."""
-    response = response.strip()
-    if not response:
-        return None
-
-    # Try structured JSON response
-    try:
-        payload = json.loads(response)
-        score = float(payload.get("score")) if "score" in payload else None
-        return score
-    except json.JSONDecodeError:
-        pass
-
-    # Fallback: extract numeric score from text
-    # Pattern matches: 20.0-20.9, 20, 10.0-19.9, 10-19, 0.0-9.9, 0-9
-    match = re.search(r"(?<!\d)(20(\.\d)?|1[0-9](\.\d)?|[0-9](\.\d)?)(?!\d)", response)
-    if match:
-        score_str = match.group(0)
-        score = float(score_str)
-        # Validate score is within 0-20 range
-        if score < 0 or score > 20:
-            return None
-        return score
-    
-    return None
\ No newline at end of file
+        analysis = await self.analyze_creativity_difference(story, standalone_creativity, results)
+        return StoryEvaluation(standalone_creativity, results, analysis, self._prompts.version)
+
+    async def evaluate_all_categories(self, story: str) -> dict[str, EvaluationResult]:
+        """Evaluate a story across all categories in a single LLM call, then evaluate creativity."""
+        results = await self.score_categories(story)
+        results["Creativity"] = await self.evaluate_contextual_creativity(story, results)
+        return results
+
+    async def score_categories(self, story: str) -> dict[str, EvaluationResult]:
+        """Score every category in a single LLM call, repairing missing categories with one follow-up call."""
+        with track_stage(COMBINED_SCORING):
+            scores, missing = self._parse_scores(await self._sample(self._scores_request(story)))
+        if missing:
+            with track_stage(FALLBACK_REPAIR):
+                self._merge_repair(scores, missing, await self._sample(self._repair_request(story, missing)))
+        return self._build_category_results(scores)
+
+    async def evaluate_contextual_creativity(self, story: str, results: dict[str, EvaluationResult]) -> EvaluationResult:
+        """Evaluate creativity based on all category results."""
+        with track_stage(CONTEXTUAL_CREATIVITY):
+            return self._creativity_result(await self._sample(self._contextual_request(story, results)))
+
+    async def evaluate_creativity(self, story: str) -> EvaluationResult:
+        """Evaluate a story's creativity directly without breaking it into categories."""
+        with track_stage(STANDALONE_CREATIVITY):
+            return self._creativity_result(await self._sample(self._creativity_request(story)))
+
+    async def analyze_creativity_difference(
+        self,
+        story: str,
+        standalone_creativity: EvaluationResult,
+        all_categories_results: dict[str, EvaluationResult]
+    ) -> dict:
+        """Analyze which categories influenced the difference in creativity scores."""
+        request = self._analysis_request(story, standalone_creativity, all_categories_results)
+        if request is None:
+            return self._analysis_result(standalone_creativity, all_categories_results, None)
+        with track_stage(DIFFERENCE_ANALYSIS):
+            response = await self._client.chat(**self._chat_kwargs(*request))
+            return self._analysis_result(standalone_creativity, all_categories_results, response)
+
+######## Score Aggregation ########
+def _score_result(responses: list[str], keep_samples: bool) -> EvaluationResult:
+    # Creativity score of one or more replies; replies without a score count as parse failures and
+    # leave the score None rather than a 0.0 that would read as a real score
+    scores = parse_score_samples(responses)
+    METRICS.record_parse_failure(len(responses) - len(scores))
+    return aggregate_samples("Creativity", scores, keep_samples)
+
+def _creativity_scores(standalone_creativity: EvaluationResult, results: dict[str, EvaluationResult]) -> tuple:
+    # (standalone, contextual) creativity; contextual falls back to standalone when it was not evaluated
+    return standalone_creativity.score, results.get("Creativity", standalone_creativity).score
+
+def aggregate_samples(category: str, samples: list[float], keep_samples: bool, default: float | None = None) -> EvaluationResult:
+    """Turn the parsed scores of one category into a result.
+
+    A single-sample evaluator keeps its one score as is. With ``keep_samples``
+    (self-consistency mode) the score is the mean and the standard deviation
+    and raw samples are kept as a confidence signal. Without any sample the
+    score is ``default``.
+    """
+    if not samples:
+        return EvaluationResult(category=category, score=default)
+    if not keep_samples:
+        return EvaluationResult(category=category, score=samples[0])
+    return EvaluationResult(
+        category=category,
+        score=round(fmean(samples), 2),
+        std=round(pstdev(samples), 2),
+        samples=samples,
+    )
+
+def build_analysis_result(
+    standalone_score: float | None, contextual_score: float | None, influential_categories: list[str]
+) -> dict:
+    """Build the creativity difference analysis payload (difference None when a creativity score is missing)."""
+    difference = None
+    if standalone_score is not None and contextual_score is not None:
+        difference = abs(standalone_score - contextual_score)
+        difference = round(difference, 1) if difference >= 0.1 else 0.0
+    return {
+        "standalone_creativity_score": standalone_score,
+        "contextual_creativity_score": contextual_score,
+        "difference": difference,
+        "influential_categories": influential_categories,
+    }
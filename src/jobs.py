@@ -0,0 +1,213 @@
+"""Background evaluation jobs, run on a dedicated event loop thread inside the MCP server."""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+from dataclasses import dataclass, field
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+RowResult = TypeVar("RowResult")
+
+# Row errors kept on a job for get_job_status (the count is always exact)
+MAX_RECORDED_ERRORS = 20
+
+
+class JobAborted(Exception):
+    """Raised by a job run when it gives up, e.g. after too many failed rows."""
+
+
+@dataclass
+class EvaluationJob:
+    """Progress and outcome of one background dataset evaluation."""
+
+    job_id: str
+    description: str
+    total_rows: int
+    output_files: list[str] = field(default_factory=list)
+    state: str = QUEUED
+    rows_done: int = 0
+    rows_skipped: int = 0
+    rows_failed: int = 0
+    errors: list[str] = field(default_factory=list)
+    error: str | None = None
+    result: dict | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    cancel_requested: bool = False
+    _task: asyncio.Task | None = field(default=None, repr=False)
+
+    def record_row(self, count: int = 1) -> None:
+        self.rows_done += count
+
+    def record_error(self, index: int, error: BaseException) -> None:
+        self.rows_failed += 1
+        if len(self.errors) < MAX_RECORDED_ERRORS:
+            self.errors.append(f"row {index}: {type(error).__name__}: {error}")
+
+    def to_dict(self) -> dict:
+        elapsed = None
+        rows_per_sec = None
+        eta_seconds = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            if self.rows_done and elapsed > 0:
+                rows_per_sec = self.rows_done / elapsed
+                if self.state == RUNNING:
+                    remaining = max(self.total_rows - self.rows_skipped - self.rows_done - self.rows_failed, 0)
+                    eta_seconds = round(remaining / rows_per_sec, 1)
+        return {
+            "job_id": self.job_id,
+            "description": self.description,
+            "output_files": list(self.output_files),
+            "state": self.state,
+            "cancel_requested": self.cancel_requested,
+            "total_rows": self.total_rows,
+            "rows_done": self.rows_done,
+            "rows_skipped": self.rows_skipped,
+            "rows_failed": self.rows_failed,
+            "rows_per_sec": round(rows_per_sec, 3) if rows_per_sec is not None else None,
+            "elapsed_seconds": round(elapsed, 1) if elapsed is not None else None,
+            "eta_seconds": eta_seconds,
+            "errors": list(self.errors),
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+class JobManager:
+    """Queue of evaluation jobs executed on one background event loop.
+
+    The loop lives in a daemon thread started on first submit, so tool calls
+    return immediately while jobs run. At most ``max_running_jobs`` run at a
+    time; the rest wait in the queue in submission order. Jobs running
+    together share that loop and therefore whatever clients their run
+    coroutines use.
+    """
+
+    def __init__(self, max_running_jobs: int = 1):
+        self._max_running_jobs = max_running_jobs
+        self._jobs: dict[str, EvaluationJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def submit(
+        self,
+        description: str,
+        total_rows: int,
+        output_files: list[str],
+        run: Callable[[EvaluationJob], Awaitable[dict]],
+    ) -> EvaluationJob:
+        """Queue ``run(job)``; its return value becomes the job's result.
+
+        Raises ValueError if an unfinished job already writes one of ``output_files``.
+        """
+        with self._lock:
+            busy = {path for j in self._jobs.values() if j.state not in FINISHED_STATES for path in j.output_files}
+            conflicts = sorted(busy.intersection(output_files))
+            if conflicts:
+                raise ValueError(f"Another job is still writing {', '.join(conflicts)}")
+            job = EvaluationJob(
+                job_id=f"job-{next(self._ids)}", description=description, total_rows=total_rows, output_files=output_files
+            )
+            self._jobs[job.job_id] = job
+            loop = self._ensure_loop()
+        asyncio.run_coroutine_threadsafe(self._run(job, run), loop)
+        print(f"[INFO] Queued {job.job_id}: {description}")
+        return job
+
+    def get(self, job_id: str) -> EvaluationJob | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[EvaluationJob]:
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> EvaluationJob | None:
+        """Cancel a queued or running job. Rows already written stay in its output file."""
+        job = self._jobs.get(job_id)
+        if job is not None and job.state not in FINISHED_STATES:
+            job.cancel_requested = True
+            self._loop.call_soon_threadsafe(self._cancel, job)
+        return job
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._slots = asyncio.Semaphore(self._max_running_jobs)
+            threading.Thread(target=self._loop.run_forever, name="evaluation-jobs", daemon=True).start()
+        return self._loop
+
+    @staticmethod
+    def _cancel(job: EvaluationJob) -> None:
+        # Runs on the job loop, so it cannot race with _run changing the state
+        if job.state in FINISHED_STATES:
+            return
+        if job.state == QUEUED:
+            job.state = CANCELLED
+            job.finished_at = time.time()
+        if job._task is not None:
+            job._task.cancel()
+
+    async def _run(self, job: EvaluationJob, run: Callable[[EvaluationJob], Awaitable[dict]]) -> None:
+        job._task = asyncio.current_task()
+        if job.state == CANCELLED:  # Cancelled before it was scheduled
+            return
+        try:
+            async with self._slots:
+                job.state = RUNNING
+                job.started_at = time.time()
+                print(f"[INFO] Started {job.job_id}")
+                job.result = await run(job)
+                job.state = COMPLETED
+        except asyncio.CancelledError:
+            job.state = CANCELLED
+            raise
+        except Exception as e:
+            job.state = FAILED
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.finished_at = time.time()
+            print(f"[INFO] {job.job_id} {job.state}")
+
+
+def tolerate_row_errors(
+    evaluate_row: Callable[[int, str, str], Awaitable[RowResult]], job: EvaluationJob, max_row_errors: int
+) -> Callable[[int, str, str], Awaitable[RowResult | None]]:
+    """Wrap a row coroutine so a failed row is recorded on the job and yields None instead of ending the run.
+
+    The job is aborted once more than ``max_row_errors`` rows have failed
+    (e.g. every endpoint is down).
+    """
+
+    async def evaluate(index: int, model: str, story: str) -> RowResult | None:
+        try:
+            return await evaluate_row(index, model, story)
+        except Exception as e:
+            job.record_error(index, e)
+            print(f"[WARNING] {job.job_id}: row {index} failed: {e}")
+            if job.rows_failed > max_row_errors:
+                raise JobAborted(f"{job.rows_failed} rows failed (limit {max_row_errors})") from e
+            return None
+
+    return evaluate
+
+
+def record_results(on_result: Callable[[RowResult], None], job: EvaluationJob) -> Callable[[RowResult], None]:
+    """Wrap an on_result callback to count finished rows on the job (failed rows never reach it)."""
+
+    def emit(result: RowResult) -> None:
+        on_result(result)
+        job.record_row()
+
+    return emit
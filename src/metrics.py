@@ -0,0 +1,231 @@
+"""In-process metrics of the evaluation pipeline: LLM call latency, token usage, retries and parse failures.
+
+Every measurement is tagged with the pipeline stage it belongs to. Evaluators
+enter a stage with ``track_stage``; the stage is kept in a context variable,
+so the client and router record their calls under it without it being passed
+through, also when many stories run concurrently on one event loop.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+STANDALONE_CREATIVITY = "standalone_creativity"
+COMBINED_SCORING = "combined_scoring"
+FALLBACK_REPAIR = "fallback_repair"  # Re-asks the categories missing from the combined reply
+CONTEXTUAL_CREATIVITY = "contextual_creativity"
+DIFFERENCE_ANALYSIS = "difference_analysis"
+UNTAGGED = "untagged"
+
+# Upper bounds in seconds; LLM calls range from tens of milliseconds (cache-warm vLLM) to minutes (long stories)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_current_stage: ContextVar[str] = ContextVar("evaluation_stage", default=UNTAGGED)
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``counts[i]`` counts observations <= ``buckets[i]``, the last slot the rest."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (None when empty or beyond the last bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 3),
+            "mean_seconds": round(self.total / self.count, 3) if self.count else None,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)} | {"+Inf": self.counts[-1]},
+        }
+
+
+class StageMetrics:
+    """Counters and histograms of one pipeline stage."""
+
+    def __init__(self):
+        self.stage_latency = Histogram()  # Whole stage: queueing, LLM call(s) and parsing
+        self.llm_latency = Histogram()  # Each LLM request, retries included
+        self.stages = 0
+        self.llm_calls = 0
+        self.cache_hits = 0
+        self.llm_errors = 0  # Requests that failed after all retries
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.parse_failures = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "stages": self.stages,
+            "llm_calls": self.llm_calls,
+            "cache_hits": self.cache_hits,
+            "llm_errors": self.llm_errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "parse_failures": self.parse_failures,
+            "stage_latency": self.stage_latency.to_dict(),
+            "llm_latency": self.llm_latency.to_dict(),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe per-stage metrics shared by every client and evaluator of the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: dict[str, StageMetrics] = {}
+        self._started_at = time.time()
+
+    def _get(self, stage: str | None) -> StageMetrics:
+        # Called with the lock held
+        stage = stage or _current_stage.get()
+        metrics = self._stages.get(stage)
+        if metrics is None:
+            metrics = self._stages[stage] = StageMetrics()
+        return metrics
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            metrics = self._get(stage)
+            metrics.stages += 1
+            metrics.stage_latency.observe(seconds)
+
+    def record_call(self, seconds: float, usage=None, stage: str | None = None) -> None:
+        """Record one completed LLM request and its ``completion.usage`` (if the server reported it)."""
+        with self._lock:
+            metrics = self._get(stage)
+            metrics.llm_calls += 1
+            metrics.llm_latency.observe(seconds)
+            if usage is not None:
+                metrics.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                metrics.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def record_error(self, seconds: float, stage: str | None = None) -> None:
+        """Record an LLM request that failed for good."""
+        with self._lock:
+            metrics = self._get(stage)
+            metrics.llm_errors += 1
+            metrics.llm_latency.observe(seconds)
+
+    def record_cache_hit(self, stage: str | None = None) -> None:
+        with self._lock:
+            self._get(stage).cache_hits += 1
+
+    def record_retry(self, stage: str | None = None) -> None:
+        with self._lock:
+            self._get(stage).retries += 1
+
+    def record_parse_failure(self, count: int = 1, stage: str | None = None) -> None:
+        if count:
+            with self._lock:
+                self._get(stage).parse_failures += count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._started_at = time.time()
+
+    def snapshot(self) -> dict:
+        """All metrics as a dict, with per-stage entries and totals over the stages."""
+        with self._lock:
+            stages = {stage: metrics.to_dict() for stage, metrics in sorted(self._stages.items())}
+            started_at = self._started_at
+        totals = {
+            key: sum(s[key] for s in stages.values())
+            for key in ("llm_calls", "cache_hits", "llm_errors", "retries", "prompt_tokens", "completion_tokens", "parse_failures")
+        }
+        totals["llm_seconds"] = round(sum(s["llm_latency"]["sum_seconds"] for s in stages.values()), 3)
+        return {"since": started_at, "uptime_seconds": round(time.time() - started_at, 1), "totals": totals, "stages": stages}
+
+    def to_prometheus(self, prefix: str = "wolverine") -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            stages = sorted(self._stages.items())
+            lines = []
+            counters = (
+                ("stage_runs_total", "Pipeline stages run", "stages"),
+                ("llm_requests_total", "LLM requests completed", "llm_calls"),
+                ("llm_cache_hits_total", "LLM calls answered from the response cache", "cache_hits"),
+                ("llm_errors_total", "LLM requests failed after all retries", "llm_errors"),
+                ("llm_retries_total", "LLM request retries", "retries"),
+                ("parse_failures_total", "LLM replies that could not be parsed", "parse_failures"),
+            )
+            for name, help_text, attr in counters:
+                lines += [f"# HELP {prefix}_{name} {help_text}.", f"# TYPE {prefix}_{name} counter"]
+                lines += [f'{prefix}_{name}{{stage="{stage}"}} {getattr(m, attr)}' for stage, m in stages]
+
+            name = f"{prefix}_llm_tokens_total"
+            lines += [f"# HELP {name} Tokens reported in completion.usage.", f"# TYPE {name} counter"]
+            for stage, m in stages:
+                lines.append(f'{name}{{stage="{stage}",kind="prompt"}} {m.prompt_tokens}')
+                lines.append(f'{name}{{stage="{stage}",kind="completion"}} {m.completion_tokens}')
+
+            histograms = (
+                ("llm_request_seconds", "Latency of each LLM request, retries included", "llm_latency"),
+                ("stage_seconds", "Wall-clock time of each pipeline stage", "stage_latency"),
+            )
+            for name, help_text, attr in histograms:
+                lines += [f"# HELP {prefix}_{name} {help_text}.", f"# TYPE {prefix}_{name} histogram"]
+                for stage, m in stages:
+                    lines += _prometheus_histogram(f"{prefix}_{name}", stage, getattr(m, attr))
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the Prometheus text dump to ``path`` atomically (e.g. for a node_exporter textfile collector)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _prometheus_histogram(name: str, stage: str, histogram: Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total:.6f}')
+    lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+    return lines
+
+
+METRICS = MetricsRegistry()
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Tag the LLM calls made inside the block with ``stage`` and record the block's duration."""
+    token = _current_stage.set(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        METRICS.record_stage(stage, time.perf_counter() - start)
+        _current_stage.reset(token)
@@ -0,0 +1,115 @@
+"""Evaluate one dataset with several evaluator models in a single pass."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from cache import ResponseCache
+from clients import AsyncWolverineClient
+from config import WOLVERINE_SETTINGS
+from engine import ResultStoreUsage, RowFailures, incremental_row_evaluator, story_row_evaluator
+from evaluation import AsyncStoryEvaluator
+from results_writer import CheckpointWriter
+from router import EndpointRouter, RouterSettings
+
+
+@dataclass
+class EvaluatorModel:
+    """An evaluator model and the vLLM endpoints serving it (empty means the configured endpoints)."""
+
+    model: str
+    endpoints: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_spec(cls, spec: str | dict) -> "EvaluatorModel":
+        """Build from a model name or a {"model": ..., "endpoints": [...]} mapping."""
+        if isinstance(spec, str):
+            return cls(model=spec)
+        return cls(model=spec["model"], endpoints=list(spec.get("endpoints") or []))
+
+    @property
+    def result_filename(self) -> str:
+        """Result file name read by notebooks/results_summary.ipynb, e.g. Llama-3.1-8B-Instruct_result.csv."""
+        return f"{self.model.split('/')[-1]}_result.csv"
+
+
+class MultiModelEvaluator:
+    """Fan each story out to several evaluator models concurrently."""
+
+    def __init__(self, models: list[EvaluatorModel], cache: ResponseCache | None = None):
+        if not models:
+            raise ValueError("At least one evaluator model is required")
+        names = [m.model for m in models]
+        if len(set(names)) != len(names):
+            raise ValueError("Evaluator models must be unique")
+
+        s = WOLVERINE_SETTINGS
+        self.models = models
+        self.clients: dict[str, AsyncWolverineClient] = {}
+        self.evaluators: dict[str, AsyncStoryEvaluator] = {}
+        for m in models:
+            router = EndpointRouter(m.endpoints or list(s.endpoints) or [s.base_url], RouterSettings.from_settings(s))
+            self.clients[m.model] = AsyncWolverineClient(cache=cache, router=router, model=m.model)
+            self.evaluators[m.model] = AsyncStoryEvaluator(self.clients[m.model])
+
+    @property
+    def samples(self) -> int:
+        """Completions per scoring call (the same for every model)."""
+        return next(iter(self.evaluators.values())).samples
+
+    @property
+    def max_concurrency(self) -> int:
+        """Largest current in-flight limit of any model's client, used to size the row window."""
+        return max(client.max_concurrency for client in self.clients.values())
+
+    def row_evaluator(
+        self,
+        writers: dict[str, CheckpointWriter],
+        store_usage: ResultStoreUsage | None = None,
+        failures: dict[str, RowFailures] | None = None,
+    ) -> Callable[[int, str, str], Awaitable[dict[str, dict]]]:
+        """Return a row coroutine producing {model: result row} for models whose writer lacks the row.
+
+        With ``store_usage``, stories already scored by a model are reused instead of re-evaluated.
+        Models are evaluated independently: a model whose evaluation raises is
+        recorded in ``failures`` under its name and left out of the row (a
+        resumed run asks it again), while the other models' rows are still
+        returned. The row only raises when every pending model failed.
+        """
+        if store_usage is None:
+            row_evaluators = {name: story_row_evaluator(evaluator) for name, evaluator in self.evaluators.items()}
+        else:
+            row_evaluators = {name: incremental_row_evaluator(evaluator, store_usage) for name, evaluator in self.evaluators.items()}
+
+        async def evaluate_row(index: int, model: str, story: str) -> dict[str, dict]:
+            pending = [name for name in self.evaluators if index not in writers[name].completed_indices]
+            outcomes = await asyncio.gather(
+                *[row_evaluators[name](index, model, story) for name in pending], return_exceptions=True
+            )
+            result_rows = {}
+            errors = []
+            for name, outcome in zip(pending, outcomes):
+                if not isinstance(outcome, BaseException):
+                    result_rows[name] = outcome
+                    continue
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                errors.append(outcome)
+                if failures is not None:
+                    failures.setdefault(name, RowFailures()).record(index, outcome)
+                print(f"[WARNING] Row {index} failed for {name}: {outcome}")
+            if errors and not result_rows:
+                raise errors[0]
+            return result_rows
+
+        return evaluate_row
+
+    async def aclose(self) -> None:
+        """Close every model's router (each model gets its own)."""
+        for client in self.clients.values():
+            await client.router.aclose()
+
+    def stats(self) -> dict:
+        return {
+            name: {**evaluator.stats(), "concurrency": self.clients[name].limiter.stats()}
+            for name, evaluator in self.evaluators.items()
+        }
@@ -0,0 +1,219 @@
+"""Parsing of evaluator replies into scores and category names.
+
+Replies are JSON in the good case, but models also wrap it in markdown fences
+or prose, prepend <think> reasoning, stop mid-object, or spell category names
+differently ("Tell-Don’t-Show", "coherent_score", "Coherent (POSITIVE)").
+``extract_json`` finds and decodes the JSON object in one pass; when that
+fails, "key": value pairs are salvaged from the text. Keys are mapped to
+categories through ``CATEGORY_ALIASES``, a normalized-name index built once at
+import, so every key costs one dict lookup and a key is never matched to a
+category merely containing it (e.g. "Incoherent" is not "Coherent").
+"""
+
+import json
+import re
+from functools import lru_cache
+from categories import CATEGORY_TYPES
+
+######## Compiled patterns ########
+_THINK_PATTERN = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE_PATTERN = re.compile(r"```[A-Za-z]*\s*(.*?)(?:```|$)", re.DOTALL)
+# "key": value pairs that can still be read from truncated or slightly malformed JSON (single quotes too)
+_SCORE_PAIR_PATTERN = re.compile(r'(?:"([^"\n]+)"|\'([^\'\n]+)\')\s*:\s*["\']?(-?\d+(?:\.\d+)?)')
+# A bare 0-20 score in prose: 20.0-20.9, 20, 10.0-19.9, 10-19, 0.0-9.9, 0-9
+_BARE_SCORE_PATTERN = re.compile(r"(?<!\d)(20(\.\d)?|1[0-9](\.\d)?|[0-9](\.\d)?)(?!\d)")
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+_PARENTHESES_PATTERN = re.compile(r"\([^)]*\)")
+_NON_ALPHANUMERIC_PATTERN = re.compile(r"[^a-z0-9]+")
+_LEADING_NUMBER_PATTERN = re.compile(r"^\d+ ")
+
+_DECODER = json.JSONDecoder()
+
+# Bump whenever a change can alter the scores read from a reply: stored results are keyed by it
+PARSER_VERSION = "2"
+
+
+######## Category alias index ########
+def normalize_key(key: str) -> str:
+    """Lowercase words of a category key without annotations, punctuation, numbering or a _score suffix."""
+    key = key.lower().replace("'", "").replace("’", "")
+    key = _PARENTHESES_PATTERN.sub(" ", key)
+    key = _NON_ALPHANUMERIC_PATTERN.sub(" ", key).strip()
+    key = _LEADING_NUMBER_PATTERN.sub("", key)
+    return key[:-6] if key.endswith(" score") else key
+
+
+# Spellings seen in replies that the normalized name does not cover
+_EXTRA_ALIASES = {
+    "Adherence to Instructions": ["instruction adherence", "adherence"],
+    "Consistent Voice / Tone of Writing": ["consistent voice", "consistent voice and tone", "consistent tone of writing"],
+    "Imagery and Descriptive Quality": ["imagery", "descriptive quality"],
+    "Well-earned Lightness or Darkness": ["well earned lightness darkness"],
+    "Unsurprising or Uncreative": ["unsurprising", "uncreative"],
+}
+
+
+def _build_aliases() -> dict[str, str]:
+    aliases = {}
+    for category in CATEGORY_TYPES:
+        name = normalize_key(category)
+        # "Imagery & Descriptive Quality", "Unsurprising/Uncreative": names without their connectives
+        compact = " ".join(word for word in name.split() if word not in ("and", "or"))
+        for alias in [name, compact] + [normalize_key(a) for a in _EXTRA_ALIASES.get(category, [])]:
+            if aliases.setdefault(alias, category) != category:
+                raise ValueError(f"Alias {alias!r} maps to both {aliases[alias]!r} and {category!r}")
+    return aliases
+
+
+CATEGORY_ALIASES = _build_aliases()
+
+
+@lru_cache(maxsize=4096)
+def match_category(key: str) -> str | None:
+    """Category a reply key refers to, or None when it names none of them."""
+    return CATEGORY_ALIASES.get(normalize_key(key))
+
+
+######## Extraction ########
+def extract_json(response: str) -> tuple[object | None, str]:
+    """Return (decoded JSON value or None, text it was searched in).
+
+    Reasoning in <think> tags is dropped and a fenced block is preferred; the
+    value is decoded from the first "{" on, so prose before or after it is
+    ignored. The returned text is what pair salvaging should scan.
+    """
+    text = _THINK_PATTERN.sub("", response) if "<think>" in response else response
+    if "```" in text:
+        fence = _FENCE_PATTERN.search(text)
+        if fence:
+            text = fence.group(1)
+    start = text.find("{")
+    if start < 0:
+        return None, text
+    try:
+        value, _ = _DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None, text
+    return value, text
+
+
+def _to_score(value) -> float | None:
+    # Numbers, numeric strings ("15.5", "15/20") and {"score": ...} objects
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMBER_PATTERN.search(value)
+        return float(match.group(0)) if match else None
+    if isinstance(value, dict):
+        return _to_score(value.get("score"))
+    return None
+
+
+def _salvaged_pairs(text: str):
+    for double_quoted, single_quoted, value in _SCORE_PAIR_PATTERN.findall(text):
+        yield double_quoted or single_quoted, value
+
+
+def clamp_score(score: float | None) -> float:
+    """Clamp a parsed score to the 0-20 range, defaulting to 0.0 if parsing failed."""
+    if score is None:
+        return 0.0
+    if score < 0:
+        return 0.0
+    if score > 20:
+        return 20.0
+    return score
+
+
+######## Reply parsers ########
+def parse_response(response: str) -> float | None:
+    """Parse a single-score reply ({"score": ...}, possibly fenced, truncated or in prose) into a number."""
+    response = response.strip()
+    if not response:
+        return None
+
+    payload, text = extract_json(response)
+    if isinstance(payload, dict):
+        if "score" in payload:
+            return _to_score(payload["score"])
+        # {"creativity_score": ...} / {"Creativity": ...}
+        for key, value in payload.items():
+            if normalize_key(key) == "creativity":
+                return _to_score(value)
+        return None
+
+    for key, value in _salvaged_pairs(text):
+        if key.strip().lower() == "score":
+            return float(value)
+
+    match = _BARE_SCORE_PATTERN.search(text)
+    if match:
+        score = float(match.group(0))
+        return score if 0 <= score <= 20 else None
+    return None
+
+
+def parse_combined_response(response: str) -> dict[str, float]:
+    """Parse the combined 'scores' response into {category: score} for every category that could be read.
+
+    Valid JSON is read directly; otherwise category/score pairs are salvaged from
+    the raw text, so a truncated reply still yields the categories it did contain.
+    Categories that cannot be found are left out rather than defaulted; when a
+    category appears twice the first score counts.
+    """
+    payload, text = extract_json(response)
+    if isinstance(payload, dict):
+        scores = payload.get("scores", payload)
+        if isinstance(scores, dict):
+            pairs = scores.items()
+        elif isinstance(scores, list):
+            # [{"category": ..., "score": ...}, ...]
+            pairs = [
+                (item.get("category") or item.get("name"), item.get("score"))
+                for item in scores if isinstance(item, dict)
+            ]
+        else:
+            pairs = ()
+    else:
+        pairs = _salvaged_pairs(text)
+
+    results = {}
+    for key, value in pairs:
+        category = match_category(key) if isinstance(key, str) else None
+        if category is None or category in results:
+            continue
+        score = _to_score(value)
+        if score is not None:
+            results[category] = clamp_score(score)
+    return results
+
+
+def parse_score_samples(responses: list[str]) -> list[float]:
+    """Parse one clamped score per reply, dropping replies without a usable score."""
+    scores = (parse_response(response) for response in responses)
+    return [clamp_score(score) for score in scores if score is not None]
+
+
+def parse_combined_samples(responses: list[str]) -> dict[str, list[float]]:
+    """Parse several combined 'scores' replies into {category: [score per reply that contained it]}."""
+    samples: dict[str, list[float]] = {}
+    for response in responses:
+        for category, score in parse_combined_response(response).items():
+            samples.setdefault(category, []).append(score)
+    return samples
+
+
+def parse_influential_categories(response: str) -> list[str]:
+    """Parse the difference-analysis response into a list of valid category names (in reply order, no repeats)."""
+    payload, _ = extract_json(response)
+    names = payload.get("influential_categories", []) if isinstance(payload, dict) else []
+    if not isinstance(names, list):
+        return []
+    categories = []
+    for name in names:
+        category = match_category(name) if isinstance(name, str) else None
+        if category is not None and category not in categories:
+            categories.append(category)
+    return categories
@@ -0,0 +1,239 @@
+"""Versioned prompt templates for every LLM call of the evaluation pipeline.
+
+A prompt set renders the system and user message of each stage:
+
+    creativity  standalone creativity score
+    scores      every category in one call
+    repair      only the categories missing from the scores reply
+    contextual  creativity given all category scores
+    analysis    which categories explain the creativity difference
+
+Version 1 is the original layout (a different system prompt per stage, the
+story after the instructions). Version 2 sends one shared system prompt and
+puts the story first in every user message, so all calls on a story start
+with an identical prefix that vLLM's automatic prefix caching reuses instead
+of prefilling the story again. Never edit a released version in a way that can
+change scores; add a new one, since results and stored scores record the
+version they were produced with.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from categories import NEGATIVE_CATEGORIES, POSITIVE_CATEGORIES, is_positive_category
+from config import WOLVERINE_SETTINGS
+
+if TYPE_CHECKING:
+    from evaluation import EvaluationResult
+
+# Story-only prompts are memoized so several evaluator models scoring the same story build them once
+PROMPT_CACHE_SIZE = 1024
+
+######## Category lists (built once) ########
+POSITIVE_LIST = "\n".join(f"  - {cat} (POSITIVE: higher is better)" for cat in POSITIVE_CATEGORIES)
+NEGATIVE_LIST = "\n".join(f"  - {cat} (NEGATIVE/PENALTY: lower is better)" for cat in NEGATIVE_CATEGORIES)
+CATEGORY_LINES = {
+    cat: f"  - {cat} ({'POSITIVE: higher is better' if is_positive_category(cat) else 'NEGATIVE/PENALTY: lower is better'})"
+    for cat in POSITIVE_CATEGORIES + NEGATIVE_CATEGORIES
+}
+AVAILABLE_CATEGORIES = (
+    "Positive Metrics:\n" + "\n".join(f"- {cat} (POSITIVE)" for cat in POSITIVE_CATEGORIES)
+    + "\n\nNegative Metrics:\n" + "\n".join(f"- {cat} (NEGATIVE)" for cat in NEGATIVE_CATEGORIES)
+)
+_CATEGORY_FIELDS = {
+    "positive_list": POSITIVE_LIST,
+    "negative_list": NEGATIVE_LIST,
+    "available_categories": AVAILABLE_CATEGORIES,
+}
+
+
+@dataclass(frozen=True)
+class ChatPrompt:
+    """System and user message of one chat request."""
+
+    system: str
+    user: str
+
+
+@dataclass(frozen=True)
+class PromptSet:
+    """One version of the prompts of every stage; user templates are str.format strings."""
+
+    version: str
+    systems: dict[str, str]
+    templates: dict[str, str]
+
+    def render(self, stage: str, **fields) -> ChatPrompt:
+        return ChatPrompt(self.systems[stage], self.templates[stage].format(**_CATEGORY_FIELDS, **fields))
+
+    def creativity(self, story: str) -> ChatPrompt:
+        """Standalone creativity prompt (no category context)."""
+        return _render_story_prompt(self.version, "creativity", story)
+
+    def scores(self, story: str) -> ChatPrompt:
+        """Prompt that scores every category in a single call."""
+        return _render_story_prompt(self.version, "scores", story)
+
+    def repair(self, story: str, categories: list[str]) -> ChatPrompt:
+        """Follow-up prompt that scores only the categories missing from an earlier reply."""
+        return self.render("repair", story=story, category_list="\n".join(CATEGORY_LINES[cat] for cat in categories))
+
+    def contextual(self, story: str, results: dict[str, "EvaluationResult"]) -> ChatPrompt:
+        """Creativity prompt that includes all category scores as context."""
+        return self.render("contextual", story=story, category_summary=_score_summary(results))
+
+    def analysis(
+        self,
+        story: str,
+        standalone_score: float,
+        contextual_score: float,
+        all_categories_results: dict[str, "EvaluationResult"],
+    ) -> ChatPrompt:
+        """Prompt asking which categories explain the creativity difference."""
+        return self.render(
+            "analysis",
+            story=story,
+            standalone_score=standalone_score,
+            contextual_score=contextual_score,
+            difference=abs(standalone_score - contextual_score),
+            category_summary=_score_summary(all_categories_results, exclude="Creativity"),
+        )
+
+
+def _score_summary(results: dict[str, "EvaluationResult"], exclude: str | None = None) -> str:
+    return "\n".join(
+        f"- {cat}: {res.score}/20" for cat, res in results.items() if cat != exclude and res.score is not None
+    )
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _render_story_prompt(version: str, stage: str, story: str) -> ChatPrompt:
+    return PROMPT_SETS[version].render(stage, story=story)
+
+
+######## Version 1: per-stage system prompts, story after the instructions ########
+_V1_JSON_SCORE_SYSTEM = (
+    "You are a literary critic. Always respond with JSON containing the key "
+    '"score" (a number from 0.0 to 20.0, can include one decimal place like 15.5).'
+)
+_V1_SCORES_SYSTEM = "You are a literary critic. Always respond with valid JSON containing a 'scores' object with category names as keys and numeric scores (0.0-20.0) as values. Remember: positive metrics should have higher scores, negative/penalty metrics should have lower scores."
+
+PROMPT_SET_V1 = PromptSet(
+    version="1",
+    systems={
+        "creativity": _V1_JSON_SCORE_SYSTEM,
+        "scores": _V1_SCORES_SYSTEM,
+        "repair": _V1_SCORES_SYSTEM,
+        "contextual": "You are a literary critic. Always respond with valid JSON containing 'score' (number 0.0-20.0).",
+        "analysis": "You are a literary analysis expert. Always respond with valid JSON.",
+    },
+    templates={
+        "creativity": (
+            "Evaluate the creativity of the following story. Consider originality, innovation, unique perspectives, and imaginative elements.\n\n"
+            "Story:\n{story}"
+        ),
+        "scores": (
+            "Evaluate the following story across all these categories. "
+            "For each category, provide a score from 0.0 to 20.0 (can include one decimal place like 15.5).\n\n"
+            "POSITIVE METRICS (Higher scores are better):\n{positive_list}\n\n"
+            "NEGATIVE/PENALTY METRICS (Lower scores are better - score how much this problem exists):\n{negative_list}\n\n"
+            "For positive metrics: higher scores indicate better quality.\n"
+            "For negative metrics: lower scores indicate less of the problem (i.e., better quality).\n\n"
+            "Respond with JSON containing a 'scores' object where each key is the category name and the value is the score (number 0.0-20.0).\n"
+            "Example format: {{\"scores\": {{\"Adherence to Instructions\": 16.5, \"Meandering\": 4.0, ...}}}}\n\n"
+            "Story:\n{story}"
+        ),
+        "repair": (
+            "Evaluate the following story on these categories only. "
+            "For each category, provide a score from 0.0 to 20.0 (can include one decimal place like 15.5).\n\n"
+            "{category_list}\n\n"
+            "Respond with JSON containing a 'scores' object with exactly these category names as keys and the score (number 0.0-20.0) as values.\n\n"
+            "Story:\n{story}"
+        ),
+        "contextual": (
+            "Based on the following evaluation scores across all categories, "
+            "what creativity score (0.0-20.0, can include one decimal place) would you give this story? "
+            "Consider how the story demonstrates originality, innovation, unique perspectives, and imaginative elements.\n\n"
+            "Evaluation Scores:\n{category_summary}\n\n"
+            "Original Story:\n{story}\n\n"
+            "Respond with JSON: {{\"score\": <number>}}"
+        ),
+        "analysis": (
+            "Two different creativity scores were given for the same story:\n"
+            "- Standalone creativity score (evaluated without category context): {standalone_score}/20\n"
+            "- Contextual creativity score (evaluated after seeing all category results): {contextual_score}/20\n"
+            "- Difference: {difference:.1f} points\n\n"
+            "All category evaluation results:\n{category_summary}\n\n"
+            "Original Story:\n{story}\n\n"
+            "Available categories:\n{available_categories}\n\n"
+            "Please identify which specific categories influenced the change in creativity score. "
+            "You MUST only select from the categories listed above. Do not create new category names. "
+            "Respond with JSON containing: "
+            '"influential_categories" (list of category names from the available categories that most influenced the difference).'
+        ),
+    },
+)
+
+######## Version 2: shared system prompt, story first (prefix-cache friendly) ########
+SHARED_SYSTEM_PROMPT = (
+    "You are a literary critic and literary analysis expert. You are given a story followed by one evaluation task about it. "
+    "Scores are numbers from 0.0 to 20.0 and can include one decimal place like 15.5. "
+    "For positive metrics higher scores mean better quality; for negative/penalty metrics lower scores mean less of the problem. "
+    "Always respond with valid JSON in exactly the format the task asks for."
+)
+# Everything up to and including this is identical for every call on the same story
+_V2_STORY_PREFIX = "Story:\n{story}\n\n---\n\n"
+
+PROMPT_SET_V2 = PromptSet(
+    version="2",
+    systems={stage: SHARED_SYSTEM_PROMPT for stage in ("creativity", "scores", "repair", "contextual", "analysis")},
+    templates={
+        "creativity": _V2_STORY_PREFIX + (
+            "Task: evaluate the creativity of the story above. "
+            "Consider originality, innovation, unique perspectives, and imaginative elements.\n\n"
+            "Respond with JSON: {{\"score\": <number>}}"
+        ),
+        "scores": _V2_STORY_PREFIX + (
+            "Task: evaluate the story above across all these categories, giving each a score from 0.0 to 20.0.\n\n"
+            "POSITIVE METRICS (Higher scores are better):\n{positive_list}\n\n"
+            "NEGATIVE/PENALTY METRICS (Lower scores are better - score how much this problem exists):\n{negative_list}\n\n"
+            "Respond with JSON containing a 'scores' object where each key is the category name and the value is the score (number 0.0-20.0).\n"
+            "Example format: {{\"scores\": {{\"Adherence to Instructions\": 16.5, \"Meandering\": 4.0, ...}}}}"
+        ),
+        "repair": _V2_STORY_PREFIX + (
+            "Task: evaluate the story above on these categories only, giving each a score from 0.0 to 20.0.\n\n"
+            "{category_list}\n\n"
+            "Respond with JSON containing a 'scores' object with exactly these category names as keys and the score (number 0.0-20.0) as values."
+        ),
+        "contextual": _V2_STORY_PREFIX + (
+            "Task: based on the following evaluation scores across all categories, "
+            "what creativity score (0.0-20.0) would you give the story above? "
+            "Consider how the story demonstrates originality, innovation, unique perspectives, and imaginative elements.\n\n"
+            "Evaluation Scores:\n{category_summary}\n\n"
+            "Respond with JSON: {{\"score\": <number>}}"
+        ),
+        "analysis": _V2_STORY_PREFIX + (
+            "Task: two different creativity scores were given for the story above:\n"
+            "- Standalone creativity score (evaluated without category context): {standalone_score}/20\n"
+            "- Contextual creativity score (evaluated after seeing all category results): {contextual_score}/20\n"
+            "- Difference: {difference:.1f} points\n\n"
+            "All category evaluation results:\n{category_summary}\n\n"
+            "Available categories:\n{available_categories}\n\n"
+            "Please identify which specific categories influenced the change in creativity score. "
+            "You MUST only select from the categories listed above. Do not create new category names. "
+            "Respond with JSON containing: "
+            '"influential_categories" (list of category names from the available categories that most influenced the difference).'
+        ),
+    },
+)
+
+PROMPT_SETS = {prompt_set.version: prompt_set for prompt_set in (PROMPT_SET_V1, PROMPT_SET_V2)}
+
+
+def get_prompt_set(version: str | None = None) -> PromptSet:
+    """Return the prompt set of ``version`` (default: ``WOLVERINE_SETTINGS.prompt_version``)."""
+    version = version or WOLVERINE_SETTINGS.prompt_version
+    try:
+        return PROMPT_SETS[version]
+    except KeyError:
+        raise ValueError(f"Unknown prompt version {version!r}; known: {', '.join(PROMPT_SETS)}") from None
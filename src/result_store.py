@@ -0,0 +1,74 @@
+"""Persistent per-story evaluation results keyed by story content (SQLite)."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from parsing import PARSER_VERSION
+
+
+class ResultStore:
+    """SQLite store of flattened evaluation results keyed by story text and the settings that produced them.
+
+    The key covers the evaluator model, prompt and parser version, temperature,
+    structured output and sample count.
+
+    Used for incremental runs: a story whose key is already stored is not
+    evaluated again, whatever its position in the dataset or its ``model``
+    column. Safe to share between threads.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, evaluator_model TEXT NOT NULL, prompt_version TEXT NOT NULL, "
+            "result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def make_key(
+        *,
+        story: str,
+        evaluator_model: str,
+        prompt_version: str,
+        temperature: float,
+        structured_output: bool,
+        samples: int = 1,
+    ) -> str:
+        """Hash the story text with every setting that changes its scores into a stable key."""
+        parts = [prompt_version, PARSER_VERSION, evaluator_model, temperature, structured_output, story]
+        if samples > 1:
+            # Self-consistency results carry extra std columns, so they are stored separately
+            parts.append({"samples": samples})
+        payload = json.dumps(parts, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """Return the stored result columns for ``key`` or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, result: dict, *, evaluator_model: str, prompt_version: str) -> None:
+        """Store (or replace) the result columns of one story."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, evaluator_model, prompt_version, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, evaluator_model, prompt_version, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+
+    def stats(self) -> dict:
+        """Return the store path and the number of stored results (lookups are counted per run by the caller)."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {"path": self._path, "entries": entries}
@@ -0,0 +1,72 @@
+"""Append-only, crash-safe CSV writer for evaluation results."""
+
+import csv
+import os
+
+
+class CheckpointWriter:
+    """Append result rows to a CSV file one at a time, fsync'ing after every row.
+
+    With ``resume=True`` an existing file is kept: a partially written last
+    line (from a crash mid-write) is truncated away and the indices already
+    present are exposed through ``completed_indices`` so callers can skip them.
+    """
+
+    def __init__(self, path: str, fieldnames: list[str], resume: bool = False):
+        self._path = path
+        self._fieldnames = fieldnames
+        self.completed_indices: set[int] = set()
+
+        if resume and os.path.exists(path):
+            self._truncate_partial_line()
+            self.completed_indices = self._read_completed_indices()
+        elif os.path.exists(path):
+            os.remove(path)
+
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+            self._sync()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def write_row(self, row: dict) -> None:
+        """Append one result row and make sure it reaches the disk."""
+        self._writer.writerow(row)
+        self._sync()
+        self.completed_indices.add(int(row["index"]))
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "CheckpointWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _truncate_partial_line(self) -> None:
+        """Drop any bytes after the last newline (an interrupted write)."""
+        with open(self._path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _read_completed_indices(self) -> set[int]:
+        with open(self._path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames is None:
+                return set()
+            if reader.fieldnames != self._fieldnames:
+                raise ValueError(
+                    f"Cannot resume {self._path}: its columns do not match the current result schema"
+                )
+            return {int(row["index"]) for row in reader if row.get("index")}
@@ -0,0 +1,276 @@
+"""Routing of chat completion requests across several vLLM replicas."""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+import httpx
+import openai
+from openai import AsyncOpenAI, OpenAI
+from config import WOLVERINE_SETTINGS, WolverineSettings
+from metrics import METRICS
+
+# Errors worth retrying on another (or the same) replica; anything else is a caller error
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,  # Includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+@dataclass
+class Endpoint:
+    """One vLLM replica with its own pooled keep-alive HTTP clients."""
+
+    base_url: str
+    client: OpenAI
+    async_client: AsyncOpenAI
+    in_flight: int = 0
+    consecutive_failures: int = 0
+    healthy: bool = True
+    last_health_check: float = 0.0
+    requests: int = 0
+    failures: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+@dataclass
+class RouterSettings:
+    """Retry, timeout and health-check knobs for EndpointRouter."""
+
+    api_key: str = "EMPTY"
+    connect_timeout: float = 10.0
+    request_timeout: float = 600.0
+    max_retries: int = 3
+    retry_backoff: float = 0.5  # Seconds, doubled per attempt with jitter
+    max_connections: int = 64  # Per endpoint
+    unhealthy_after_failures: int = 3
+    health_check_interval: float = 30.0
+
+    @classmethod
+    def from_settings(cls, s: WolverineSettings) -> "RouterSettings":
+        return cls(
+            api_key=s.api_key,
+            connect_timeout=s.connect_timeout,
+            request_timeout=s.request_timeout,
+            max_retries=s.max_retries,
+            retry_backoff=s.retry_backoff,
+            max_connections=s.max_connections_per_endpoint,
+            unhealthy_after_failures=s.unhealthy_after_failures,
+            health_check_interval=s.health_check_interval,
+        )
+
+
+class EndpointRouter:
+    """Send each request to the least-loaded healthy replica, retrying with backoff on transient errors.
+
+    An endpoint is taken out of rotation after ``unhealthy_after_failures``
+    consecutive failures and re-admitted once a ``/models`` health check
+    succeeds (probed at most every ``health_check_interval`` seconds).
+    """
+
+    def __init__(self, base_urls: list[str], settings: RouterSettings | None = None):
+        if not base_urls:
+            raise ValueError("EndpointRouter needs at least one endpoint")
+        self._settings = settings or RouterSettings()
+        self._lock = threading.Lock()
+        self._endpoints = [self._make_endpoint(url) for url in base_urls]
+
+    @classmethod
+    def from_settings(cls, s: WolverineSettings = WOLVERINE_SETTINGS) -> "EndpointRouter":
+        return cls(list(s.endpoints) or [s.base_url], RouterSettings.from_settings(s))
+
+    @property
+    def endpoints(self) -> list[Endpoint]:
+        return list(self._endpoints)
+
+    def status(self) -> list[dict]:
+        """Return load and health information for every endpoint."""
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self._endpoints]
+
+    def create(self, **kwargs):
+        """Create a chat completion on the least-loaded healthy endpoint (blocking)."""
+        last_error = None
+        start = time.perf_counter()
+        for attempt in range(self._settings.max_retries + 1):
+            if attempt:
+                METRICS.record_retry()
+                time.sleep(self._backoff(attempt))
+            endpoint = self._acquire()
+            try:
+                completion = endpoint.client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                self._record_failure(endpoint, e)
+                continue
+            except Exception:
+                METRICS.record_error(time.perf_counter() - start)
+                raise
+            finally:
+                self._release(endpoint)
+            self._record_success(endpoint)
+            METRICS.record_call(time.perf_counter() - start, completion.usage)
+            return completion
+        METRICS.record_error(time.perf_counter() - start)
+        raise last_error
+
+    async def acreate(self, on_error: Callable[[Exception], None] | None = None, **kwargs):
+        """Create a chat completion on the least-loaded healthy endpoint.
+
+        ``on_error`` is called with the error of every failed attempt, retried or
+        not (the async client feeds its concurrency limiter this way).
+        """
+        last_error = None
+        start = time.perf_counter()
+        for attempt in range(self._settings.max_retries + 1):
+            if attempt:
+                METRICS.record_retry()
+                await asyncio.sleep(self._backoff(attempt))
+            endpoint = await self._aacquire()
+            try:
+                completion = await endpoint.async_client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                self._record_failure(endpoint, e)
+                if on_error is not None:
+                    on_error(e)
+                continue
+            except Exception as e:
+                METRICS.record_error(time.perf_counter() - start)
+                if on_error is not None:
+                    on_error(e)
+                raise
+            finally:
+                self._release(endpoint)
+            self._record_success(endpoint)
+            METRICS.record_call(time.perf_counter() - start, completion.usage)
+            return completion
+        METRICS.record_error(time.perf_counter() - start)
+        raise last_error
+
+    def check_health(self) -> list[dict]:
+        """Probe every endpoint now and return the updated status."""
+        for endpoint in self._endpoints:
+            self._probe(endpoint)
+        return self.status()
+
+    def close(self) -> None:
+        """Close the blocking clients' connection pools (use ``aclose`` when the async clients were used)."""
+        for endpoint in self._endpoints:
+            endpoint.client.close()
+
+    async def aclose(self) -> None:
+        """Close the connection pools of both the blocking and the async clients."""
+        self.close()
+        for endpoint in self._endpoints:
+            await endpoint.async_client.close()
+
+    def _make_endpoint(self, base_url: str) -> Endpoint:
+        s = self._settings
+        timeout = httpx.Timeout(s.request_timeout, connect=s.connect_timeout)
+        limits = httpx.Limits(max_connections=s.max_connections, max_keepalive_connections=s.max_connections)
+        # Retries are handled here so a failed request can move to another replica
+        return Endpoint(
+            base_url=base_url,
+            client=OpenAI(
+                base_url=base_url,
+                api_key=s.api_key,
+                max_retries=0,
+                http_client=httpx.Client(timeout=timeout, limits=limits),
+            ),
+            async_client=AsyncOpenAI(
+                base_url=base_url,
+                api_key=s.api_key,
+                max_retries=0,
+                http_client=httpx.AsyncClient(timeout=timeout, limits=limits),
+            ),
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        delay = self._settings.retry_backoff * (2 ** (attempt - 1))
+        return delay * (0.5 + random.random())
+
+    def _pick(self) -> Endpoint:
+        with self._lock:
+            candidates = [e for e in self._endpoints if e.healthy] or self._endpoints
+            # Least loaded first; ties go to the endpoint that has served the fewest requests
+            endpoint = min(candidates, key=lambda e: (e.in_flight, e.requests))
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _due_for_probe(self) -> list[Endpoint]:
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                e for e in self._endpoints
+                if not e.healthy and now - e.last_health_check >= self._settings.health_check_interval
+            ]
+            for endpoint in due:
+                endpoint.last_health_check = now
+            return due
+
+    def _acquire(self) -> Endpoint:
+        for endpoint in self._due_for_probe():
+            self._probe(endpoint)
+        return self._pick()
+
+    async def _aacquire(self) -> Endpoint:
+        for endpoint in self._due_for_probe():
+            await self._aprobe(endpoint)
+        return self._pick()
+
+    def _release(self, endpoint: Endpoint) -> None:
+        with self._lock:
+            endpoint.in_flight -= 1
+
+    def _record_success(self, endpoint: Endpoint) -> None:
+        with self._lock:
+            endpoint.consecutive_failures = 0
+
+    def _record_failure(self, endpoint: Endpoint, error: Exception) -> None:
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.healthy and endpoint.consecutive_failures >= self._settings.unhealthy_after_failures:
+                endpoint.healthy = False
+                endpoint.last_health_check = time.monotonic()
+                print(f"[WARNING] Endpoint {endpoint.base_url} marked unhealthy: {error}", file=sys.stderr, flush=True)
+
+    def _probe(self, endpoint: Endpoint) -> None:
+        try:
+            endpoint.client.with_options(timeout=self._settings.connect_timeout).models.list()
+        except Exception:
+            self._mark(endpoint, healthy=False)
+        else:
+            self._mark(endpoint, healthy=True)
+
+    async def _aprobe(self, endpoint: Endpoint) -> None:
+        try:
+            await endpoint.async_client.with_options(timeout=self._settings.connect_timeout).models.list()
+        except Exception:
+            self._mark(endpoint, healthy=False)
+        else:
+            self._mark(endpoint, healthy=True)
+
+    def _mark(self, endpoint: Endpoint, healthy: bool) -> None:
+        with self._lock:
+            endpoint.last_health_check = time.monotonic()
+            if healthy and not endpoint.healthy:
+                print(f"[INFO] Endpoint {endpoint.base_url} is healthy again", file=sys.stderr, flush=True)
+            endpoint.healthy = healthy
+            if healthy:
+                endpoint.consecutive_failures = 0
@@ -1,43 +1,140 @@
 from fastmcp import FastMCP
-from evaluation import StoryEvaluator, STORY_EVALUATION_CATEGORIES
-from clients import WolverineClient
-import pandas as pd
+from evaluation import AsyncStoryEvaluator, StoryEvaluator, STORY_EVALUATION_CATEGORIES
+from engine import (
+    BATCH_MODES,
+    ResultStoreUsage,
+    RowFailures,
+    evaluate_rows,
+    evaluate_story_batch,
+    incremental_row_evaluator,
+    result_columns,
+    skip_failed_rows,
+    story_row_evaluator,
+)
+from results_writer import CheckpointWriter
+from dataset import IndexedCSVDataset
+from jobs import EvaluationJob, JobManager, record_results, tolerate_row_errors
+from metrics import METRICS
+from contextlib import ExitStack
+from functools import lru_cache
+from config import DATASET_PATH, RESULTS_DIR, WOLVERINE_SETTINGS
 import os
 from datetime import datetime
 from pathlib import Path
 
 mcp = FastMCP(name="Story Evaluator")
-client = WolverineClient()
-evaluator = StoryEvaluator(client)
 
 # Get the directory where this script is located
 SCRIPT_DIR = Path(__file__).parent.absolute()
-# Project root is one level up from src/
-PROJECT_ROOT = SCRIPT_DIR.parent
 
-DATASET_PATH = PROJECT_ROOT / "dataset" / "data.csv"
-RESULTS_DIR = PROJECT_ROOT / "dataset" / "results"
 _dataset = None
 
-def load_dataset():
-    """Load the dataset into memory on first access."""
+# Every evaluator the tools have built, by label, so get_evaluator_stats covers all of their traffic
+_evaluators: dict[str, StoryEvaluator | AsyncStoryEvaluator] = {}
+
+def _register_evaluator(label: str, evaluator):
+    # An evaluator evicted from an lru_cache and built again keeps counting on the registered one
+    return _evaluators.setdefault(label, evaluator)
+
+# LLM clients are created on first use, so starting the server does not import openai/httpx
+@lru_cache(maxsize=None)
+def get_response_cache():
+    """Shared on-disk response cache (None when caching is disabled)."""
+    if not WOLVERINE_SETTINGS.cache_enabled:
+        return None
+    from cache import ResponseCache
+    return ResponseCache(WOLVERINE_SETTINGS.cache_path, WOLVERINE_SETTINGS.cache_max_entries)
+
+@lru_cache(maxsize=None)
+def get_result_store():
+    """Per-story results reused by incremental runs."""
+    from result_store import ResultStore
+    return ResultStore(WOLVERINE_SETTINGS.result_store_path)
+
+@lru_cache(maxsize=None)
+def get_router():
+    """Shared router over the configured vLLM endpoints."""
+    from router import EndpointRouter
+    return EndpointRouter.from_settings(WOLVERINE_SETTINGS)
+
+@lru_cache(maxsize=None)
+def get_evaluator() -> StoryEvaluator:
+    """Evaluator used by the interactive (single-story) tools."""
+    from clients import WolverineClient
+    return _register_evaluator("interactive", StoryEvaluator(WolverineClient(cache=get_response_cache(), router=get_router())))
+
+@lru_cache(maxsize=None)
+def get_uncached_evaluator() -> StoryEvaluator:
+    """Interactive evaluator that always samples fresh replies (use_cache=False)."""
+    from clients import WolverineClient
+    return _register_evaluator("interactive_uncached", StoryEvaluator(WolverineClient(router=get_router())))
+
+# Evaluators for non-default sample counts are kept, so repeated tool calls reuse them and their stats
+@lru_cache(maxsize=16)
+def get_sampling_evaluator(samples: int | None, use_cache: bool = True) -> StoryEvaluator:
+    """The interactive evaluator (or its uncached twin), or one sharing its client that draws ``samples`` completions per scoring call."""
+    evaluator = get_evaluator() if use_cache else get_uncached_evaluator()
+    if samples is None or samples == evaluator.samples:
+        return evaluator
+    label = f"interactive{'' if use_cache else '_uncached'}_samples_{samples}"
+    return _register_evaluator(label, StoryEvaluator(evaluator.client, samples=samples))
+
+@lru_cache(maxsize=None)
+def get_async_evaluator() -> AsyncStoryEvaluator:
+    """Evaluator used by the dataset tools; its client's concurrency limit is kept across runs."""
+    from clients import AsyncWolverineClient
+    return _register_evaluator("dataset", AsyncStoryEvaluator(AsyncWolverineClient(cache=get_response_cache(), router=get_router())))
+
+@lru_cache(maxsize=None)
+def get_uncached_async_evaluator() -> AsyncStoryEvaluator:
+    """Async evaluator that always samples fresh replies (use_cache=False)."""
+    from clients import AsyncWolverineClient
+    return _register_evaluator("dataset_uncached", AsyncStoryEvaluator(AsyncWolverineClient(router=get_router())))
+
+@lru_cache(maxsize=16)
+def get_run_evaluator(samples: int | None, use_cache: bool = True) -> AsyncStoryEvaluator:
+    """The async evaluator (or its uncached twin), or one sharing its client that draws ``samples`` completions per scoring call."""
+    evaluator = get_async_evaluator() if use_cache else get_uncached_async_evaluator()
+    if samples is None or samples == evaluator.samples:
+        return evaluator
+    label = f"dataset{'' if use_cache else '_uncached'}_samples_{samples}"
+    return _register_evaluator(label, AsyncStoryEvaluator(evaluator.client, samples=samples))
+
+def load_dataset() -> IndexedCSVDataset | None:
+    """Open the dataset on first access (builds or reuses its row index; rows are read on demand)."""
     global _dataset
     if _dataset is None:
         dataset_path_str = str(DATASET_PATH)
         if os.path.exists(dataset_path_str):
             try:
-                _dataset = pd.read_csv(dataset_path_str)
+                _dataset = IndexedCSVDataset(dataset_path_str)
                 print(f"[INFO] Dataset loaded: {len(_dataset)} entries from {dataset_path_str}")
             except Exception as e:
                 print(f"[ERROR] Failed to load dataset: {e}")
-                _dataset = pd.DataFrame()
         else:
             print(f"[WARNING] Dataset file not found: {dataset_path_str}")
             print(f"[INFO] Current working directory: {os.getcwd()}")
             print(f"[INFO] Script directory: {SCRIPT_DIR}")
-            _dataset = pd.DataFrame()
     return _dataset
 
+def multi_model_outputs(evaluator_models, output_dir: str | None, resume: bool, overwrite: bool) -> tuple[Path, list[str]]:
+    """Return the directory and <model>_result.csv paths of a multi-model run.
+
+    Raises ValueError when a result file already exists and neither resume nor
+    overwrite is set, since a fresh run would replace it (e.g. the result files
+    the notebook reads).
+    """
+    directory = RESULTS_DIR / output_dir if output_dir else RESULTS_DIR
+    paths = [str(directory / m.result_filename) for m in evaluator_models]
+    existing = [path for path in paths if os.path.exists(path)]
+    if existing and not (resume or overwrite):
+        raise ValueError(
+            f"Result files already exist: {', '.join(existing)}. "
+            "Pass output_dir to write elsewhere, resume=True to continue them or overwrite=True to replace them"
+        )
+    os.makedirs(directory, exist_ok=True)
+    return directory, paths
+
 def ensure_results_dir():
     """Create results directory if it doesn't exist."""
     try:
@@ -54,7 +151,7 @@ def read_dataset(index: int) -> dict:
     print(f"[INFO] Tool called: read_dataset with index={index}")
     dataset = load_dataset()
     
-    if dataset.empty:
+    if dataset is None or dataset.empty:
         return {"error": "Dataset is not loaded or is empty"}
     
     if index < 0 or index >= len(dataset):
@@ -62,7 +159,7 @@ def read_dataset(index: int) -> dict:
             "error": f"Index {index} out of range. Dataset has {len(dataset)} entries (valid range: 0-{len(dataset)-1})."
         }
     
-    row = dataset.iloc[index]
+    row = dataset[index]
     return {
         "index": index,
         "model": str(row.get("model", "")),
@@ -77,30 +174,232 @@ def list_categories() -> list[str]:
     return STORY_EVALUATION_CATEGORIES
 
 @mcp.tool()
-def evaluate_all_categories(story: str) -> dict[str, dict]:
-    """Evaluate a story across all evaluation categories."""
+def evaluate_all_categories(story: str, samples: int = None, use_cache: bool = True) -> dict[str, dict]:
+    """Evaluate a story across all evaluation categories. With samples > 1 each score is the mean of that many completions drawn in one request, reported with its std and the raw samples. Set use_cache=False to resample instead of returning cached replies."""
     print("[INFO] Tool called: evaluate_all_categories")
-    results = evaluator.evaluate_all_categories(story)
+    results = get_sampling_evaluator(samples, use_cache).evaluate_all_categories(story)
     return {cat: res.to_dict() for cat, res in results.items()}
 
 @mcp.tool()
-def evaluate_creativity(story: str) -> dict:
-    """Evaluate a story's creativity directly without breaking it into categories."""
+def evaluate_creativity(story: str, samples: int = None, use_cache: bool = True) -> dict:
+    """Evaluate a story's creativity directly without breaking it into categories. With samples > 1 the score is the mean of that many completions, with std and raw samples. Set use_cache=False to resample instead of returning cached replies."""
     print("[INFO] Tool called: evaluate_creativity")
-    result = evaluator.evaluate_creativity(story)
+    result = get_sampling_evaluator(samples, use_cache).evaluate_creativity(story)
     return result.to_dict()
 
 @mcp.tool()
-def evaluate_full_dataset(output_filename: str = None) -> dict:
-    """Evaluate the entire dataset and save results to CSV. Returns the CSV file path and summary."""
+def get_cache_stats() -> dict:
+    """Return hit/miss counters and size of the on-disk LLM response cache."""
+    print("[INFO] Tool called: get_cache_stats")
+    response_cache = get_response_cache()
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+@mcp.tool()
+def clear_cache() -> dict:
+    """Remove every cached LLM response."""
+    print("[INFO] Tool called: clear_cache")
+    response_cache = get_response_cache()
+    if response_cache is None:
+        return {"enabled": False}
+    response_cache.clear()
+    return {"enabled": True, **response_cache.stats()}
+
+@mcp.tool()
+def get_endpoint_status(check_health: bool = False) -> list[dict]:
+    """Return load and health of every vLLM endpoint. Set check_health=True to probe each endpoint first."""
+    print("[INFO] Tool called: get_endpoint_status")
+    router = get_router()
+    return router.check_health() if check_health else router.status()
+
+@mcp.tool()
+def get_evaluator_stats() -> dict:
+    """Return combined-scoring call counts and how many replies fell back to the expensive per-category path, for every evaluator the tools have used (default, uncached and per sample count) plus their total. Multi-model runs report their evaluators in the run summary instead."""
+    print("[INFO] Tool called: get_evaluator_stats")
+    get_evaluator(), get_async_evaluator()
+    stats = {label: evaluator.stats() for label, evaluator in _evaluators.items()}
+    counters = ("combined_calls", "fallback_events", "unscored_categories")
+    stats["total"] = {name: sum(s[name] for s in stats.values()) for name in counters}
+    return stats
+
+@mcp.tool()
+def get_metrics(format: str = "json", output_path: str = None, reset: bool = False) -> dict:
+    """Return per-stage metrics of every LLM call since start (or the last reset): latency histograms with p50/p95/p99, prompt/completion tokens, retries, errors, cache hits and parse failures. Stages are standalone_creativity, combined_scoring, fallback_repair, contextual_creativity and difference_analysis. format="prometheus" returns the Prometheus text exposition instead; output_path also writes that text to a file (e.g. for a node_exporter textfile collector). reset=True clears the metrics after reading them."""
+    print("[INFO] Tool called: get_metrics")
+    if format not in ("json", "prometheus"):
+        return {"error": f"Unknown format {format!r}; use 'json' or 'prometheus'"}
+    result = {"prometheus": METRICS.to_prometheus()} if format == "prometheus" else METRICS.snapshot()
+    if output_path:
+        METRICS.write_prometheus(output_path)
+        result["output_file"] = output_path
+    if reset:
+        METRICS.reset()
+    return result
+
+@mcp.tool()
+def evaluate_story_full(story: str, use_cache: bool = True) -> dict:
+    """Evaluate a story end to end: standalone creativity, all categories, contextual creativity and the analysis of which categories explain the creativity difference. Set use_cache=False to resample instead of returning cached replies."""
+    print("[INFO] Tool called: evaluate_story_full")
+    return get_sampling_evaluator(None, use_cache).evaluate_story_full(story).to_dict()
+
+@mcp.tool()
+async def evaluate_batch(stories: list[str], mode: str = "all_categories", samples: int = None, use_cache: bool = True) -> dict:
+    """Evaluate several stories in one call instead of one tool call per story. mode is "creativity" (as evaluate_creativity), "all_categories" (as evaluate_all_categories) or "full" (as evaluate_story_full). Identical stories are evaluated once and the LLM calls of all stories run concurrently. Returns one item per story in input order: {"index", "result"} or {"index", "error"}, plus "duplicate_of" (index of the first copy) for repeated stories. Set use_cache=False to resample instead of returning cached replies."""
+    print(f"[INFO] Tool called: evaluate_batch with {len(stories)} stories, mode={mode}")
+    if mode not in BATCH_MODES:
+        return {"error": f"Unknown mode {mode!r}; use one of {', '.join(BATCH_MODES)}"}
+    if len(stories) > WOLVERINE_SETTINGS.max_batch_stories:
+        return {
+            "error": f"{len(stories)} stories exceed the batch limit of {WOLVERINE_SETTINGS.max_batch_stories}; "
+            "use start_evaluation_job for larger sets"
+        }
+    
+    items = await evaluate_story_batch(get_run_evaluator(samples, use_cache), stories, mode)
+    return {
+        "mode": mode,
+        "stories": len(stories),
+        "unique_stories": len(set(stories)),
+        "errors": sum("error" in item for item in items),
+        "items": items,
+    }
+
+async def run_dataset_evaluation(
+    dataset: IndexedCSVDataset,
+    output_path: str,
+    resume: bool,
+    evaluator: AsyncStoryEvaluator,
+    job: EvaluationJob | None = None,
+    incremental: bool = False,
+) -> dict:
+    """Evaluate every pending dataset row into a CSV checkpoint and return the run summary.
+
+    Failed rows are skipped (left for a resumed run) instead of ending the run; they are counted in the summary, or on
+    the job when there is one. With incremental, stories already in the result store (same text, evaluator model, prompt and parser version, temperature and structured output) are reused.
+    """
+    with CheckpointWriter(output_path, result_columns(evaluator.samples), resume=resume) as writer:
+        skipped = len(writer.completed_indices)
+        if skipped:
+            print(f"[INFO] Resuming: {skipped} entries already in {output_path}")
+        
+        # Stream pending rows through the async engine; rows are written in index order as they complete
+        rows = (
+            (i, row.get("model", ""), row.get("response", ""))
+            for i, row in dataset.iter_rows()
+            if i not in writer.completed_indices
+        )
+        # Store lookups are counted per run: the store is shared by every run of this process
+        store_usage = ResultStoreUsage(get_result_store()) if incremental else None
+        if store_usage is not None:
+            evaluate_row = incremental_row_evaluator(evaluator, store_usage)
+        else:
+            evaluate_row = story_row_evaluator(evaluator)
+        on_result = writer.write_row
+        failures = RowFailures()
+        if job is not None:
+            job.rows_skipped = skipped
+            evaluate_row = tolerate_row_errors(evaluate_row, job, WOLVERINE_SETTINGS.job_max_row_errors)
+            on_result = record_results(on_result, job)
+        else:
+            evaluate_row = skip_failed_rows(evaluate_row, failures)
+        evaluated = await evaluate_rows(
+            evaluate_row,
+            rows,
+            # Follows the adaptive limit, so growing it also lets more rows (and requests) in
+            max_active_rows=lambda: evaluator.client.max_concurrency,
+            on_result=on_result,
+        )
+        entries_done = len(writer.completed_indices)
+    
+    return {
+        "output_file": output_path,
+        "entries_evaluated": evaluated,
+        "entries_skipped": skipped,
+        "entries_done": entries_done,
+        "total_entries": len(dataset),
+        **failures.to_dict(),
+        "evaluator": evaluator.stats(),
+        "concurrency": evaluator.client.limiter.stats(),
+        "result_store": store_usage.to_dict() if store_usage is not None else None,
+    }
+
+async def run_multi_model_evaluation(
+    dataset: IndexedCSVDataset,
+    multi_evaluator,
+    resume: bool,
+    job: EvaluationJob | None = None,
+    incremental: bool = False,
+    output_dir: Path = RESULTS_DIR,
+) -> dict:
+    """Evaluate every pending dataset row with each model of a MultiModelEvaluator, one CSV checkpoint per model in ``output_dir``.
+
+    A model that fails on a row does not cost the other models their results: its failures are counted per model in
+    model_failures, and rows_failed only counts rows every pending model failed.
+    """
+    columns = result_columns(multi_evaluator.samples)
+    with ExitStack() as stack:
+        writers = {
+            m.model: stack.enter_context(CheckpointWriter(str(output_dir / m.result_filename), columns, resume=resume))
+            for m in multi_evaluator.models
+        }
+        
+        def write_rows(model_rows: dict[str, dict]) -> None:
+            for name, result_row in model_rows.items():
+                writers[name].write_row(result_row)
+        
+        # The dataset is decoded once and every story is fanned out to all models
+        rows = (
+            (i, row.get("model", ""), row.get("response", ""))
+            for i, row in dataset.iter_rows()
+            if any(i not in writer.completed_indices for writer in writers.values())
+        )
+        store_usage = ResultStoreUsage(get_result_store()) if incremental else None
+        model_failures = {name: RowFailures() for name in writers}
+        evaluate_row = multi_evaluator.row_evaluator(writers, store_usage, model_failures)
+        on_result = write_rows
+        failures = RowFailures()
+        if job is not None:
+            job.rows_skipped = min(len(writer.completed_indices) for writer in writers.values())
+            evaluate_row = tolerate_row_errors(evaluate_row, job, WOLVERINE_SETTINGS.job_max_row_errors)
+            on_result = record_results(on_result, job)
+        else:
+            evaluate_row = skip_failed_rows(evaluate_row, failures)
+        evaluated = await evaluate_rows(
+            evaluate_row,
+            rows,
+            max_active_rows=lambda: multi_evaluator.max_concurrency,
+            on_result=on_result,
+        )
+        outputs = {name: writer.path for name, writer in writers.items()}
+        entries_done = {name: len(writer.completed_indices) for name, writer in writers.items()}
+    
+    return {
+        "output_files": outputs,
+        "stories_evaluated": evaluated,
+        "entries_done": entries_done,
+        "total_entries": len(dataset),
+        **failures.to_dict(),
+        "model_failures": {name: model.to_dict() for name, model in model_failures.items()},
+        "evaluators": multi_evaluator.stats(),
+        "result_store": store_usage.to_dict() if store_usage is not None else None,
+    }
+
+@mcp.tool()
+async def evaluate_full_dataset(
+    output_filename: str = None, use_cache: bool = True, resume: bool = False, incremental: bool = False, samples: int = None
+) -> dict:
+    """Evaluate the entire dataset, appending each result row to a CSV checkpoint as it completes. Returns the CSV file path and a summary. Set resume=True (with the same output_filename) to skip rows already in the file, and use_cache=False to resample every response instead of reusing cached ones. Set incremental=True to evaluate only stories whose text has not been scored before by this evaluator model with the current prompt and parser version, temperature and structured output setting, reusing stored scores for the rest. samples > 1 draws that many completions per scoring call and adds *_std confidence columns. For long runs prefer start_evaluation_job."""
     print(f"[INFO] Tool called: evaluate_full_dataset")
     dataset = load_dataset()
     
-    if dataset.empty:
+    if dataset is None or dataset.empty:
         return {"error": "Dataset is not loaded or is empty"}
     
     total_entries = len(dataset)
     
+    if resume and output_filename is None:
+        return {"error": "resume=True requires the output_filename of the run to resume"}
+    
     # Generate filename if not provided
     if output_filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -110,65 +409,174 @@ def evaluate_full_dataset(output_filename: str = None) -> dict:
     ensure_results_dir()
     output_path = str(RESULTS_DIR / output_filename)
     
-    # Evaluate each entry
-    results = []
-    for i in range(total_entries):
-        print(f"[INFO] Evaluating entry {i+1}/{total_entries}")
-        row = dataset.iloc[i]
-        story = str(row.get("response", ""))
-        model = str(row.get("model", ""))
-        
-        # 1. Standalone creativity evaluation (direct, without category context)
-        standalone_creativity = evaluator.evaluate_creativity(story)
-        
-        # 2. Evaluate all categories (includes contextual creativity)
-        eval_results = evaluator.evaluate_all_categories(story)
-        contextual_creativity = eval_results.get("Creativity", standalone_creativity)
-        
-        # 3. Analyze which categories influenced the creativity difference (like compare_creativity_scores)
-        analysis = evaluator.analyze_creativity_difference(
-            story,
-            standalone_creativity,
-            eval_results
-        )
-        
-        # Create result row
-        result_row = {
-            "index": i,
-            "model": model,
-        }
-        
-        # Add all category scores (only scores, no explanations)
-        for category, result in eval_results.items():
-            if category != "Creativity":  # Creativity is handled separately
-                result_row[f"{category}_score"] = result.score
-        
-        # Add both creativity scores
-        result_row["creativity_standalone_score"] = standalone_creativity.score
-        result_row["creativity_contextual_score"] = contextual_creativity.score
-        result_row["creativity_difference"] = round(abs(standalone_creativity.score - contextual_creativity.score), 1)
-        
-        # Add analysis results (influential categories)
-        influential_categories = analysis.get("influential_categories", [])
-        result_row["influential_categories"] = ", ".join(influential_categories) if influential_categories else ""
-        
-        results.append(result_row)
-    
-    # Save to CSV
-    results_df = pd.DataFrame(results)
-    results_df.to_csv(output_path, index=False)
+    response_cache = get_response_cache() if use_cache else None
+    run_evaluator = get_run_evaluator(samples, use_cache)
     
-    # Get CSV content as string
-    csv_content = results_df.to_csv(index=False)
+    try:
+        summary = await run_dataset_evaluation(dataset, output_path, resume, run_evaluator, incremental=incremental)
+    except ValueError as e:
+        return {"error": str(e)}
     
     return {
         "success": True,
-        "output_file": output_path,
-        "entries_evaluated": len(results),
-        "total_entries": total_entries,
-        "csv_content": csv_content,
+        **summary,
+        "cache": response_cache.stats() if response_cache is not None else None,
         "message": f"Full dataset evaluation completed. Results saved to {output_path}"
     }
 
+@mcp.tool()
+async def evaluate_dataset_multi_model(
+    models: list[str | dict],
+    resume: bool = False,
+    use_cache: bool = True,
+    incremental: bool = False,
+    output_dir: str = None,
+    overwrite: bool = False,
+) -> dict:
+    """Evaluate the dataset with several evaluator models in one pass, writing one <model>_result.csv per model into the results directory (or its output_dir subdirectory). Each model is a name or {"model": name, "endpoints": [base_url, ...]}; models without endpoints use the configured ones. Existing result files are never replaced unless overwrite=True; set resume=True to keep rows already in those files instead. incremental=True reuses stored scores of stories each model has already evaluated."""
+    print(f"[INFO] Tool called: evaluate_dataset_multi_model")
+    dataset = load_dataset()
+    
+    if dataset is None or dataset.empty:
+        return {"error": "Dataset is not loaded or is empty"}
+    
+    from multi_model import EvaluatorModel, MultiModelEvaluator
+    response_cache = get_response_cache() if use_cache else None
+    try:
+        evaluator_models = [EvaluatorModel.from_spec(spec) for spec in models]
+        multi_evaluator = MultiModelEvaluator(evaluator_models, cache=response_cache)
+    except (KeyError, TypeError, ValueError) as e:
+        return {"error": f"Invalid models: {e}"}
+    
+    ensure_results_dir()
+    try:
+        directory, _ = multi_model_outputs(evaluator_models, output_dir, resume, overwrite)
+        summary = await run_multi_model_evaluation(dataset, multi_evaluator, resume, incremental=incremental, output_dir=directory)
+    except ValueError as e:
+        return {"error": str(e)}
+    finally:
+        await multi_evaluator.aclose()
+    
+    return {
+        "success": True,
+        **summary,
+        "cache": response_cache.stats() if response_cache is not None else None,
+        "message": f"Multi-model evaluation completed for {len(evaluator_models)} models. Results saved to {directory}"
+    }
+
+######## Background jobs ########
+
+job_manager = JobManager(WOLVERINE_SETTINGS.max_running_jobs)
+
+@lru_cache(maxsize=None)
+def get_job_evaluator() -> AsyncStoryEvaluator:
+    """Evaluator shared by background jobs. Jobs run on their own event loop, so they need their own HTTP clients."""
+    from clients import AsyncWolverineClient
+    from router import EndpointRouter
+    return AsyncStoryEvaluator(
+        AsyncWolverineClient(cache=get_response_cache(), router=EndpointRouter.from_settings(WOLVERINE_SETTINGS))
+    )
+
+@mcp.tool()
+def start_evaluation_job(
+    models: list[str | dict] | None = None,
+    dataset_path: str = None,
+    output_filename: str = None,
+    resume: bool = False,
+    use_cache: bool = True,
+    incremental: bool = False,
+    samples: int = None,
+    output_dir: str = None,
+    overwrite: bool = False,
+) -> dict:
+    """Queue a dataset evaluation in the background and return its job id immediately; poll it with get_job_status. Without models the configured evaluator model writes output_filename (like evaluate_full_dataset); with models each writes its own <model>_result.csv into the results directory or its output_dir subdirectory, refusing to replace existing files unless overwrite=True (like evaluate_dataset_multi_model). dataset_path defaults to the bundled dataset. Set resume=True to skip rows already in the output files, and incremental=True to reuse stored scores of stories already evaluated. samples > 1 (single-model jobs) draws that many completions per scoring call and adds *_std confidence columns."""
+    print(f"[INFO] Tool called: start_evaluation_job")
+    if dataset_path is None:
+        dataset = load_dataset()
+    elif os.path.exists(dataset_path):
+        dataset = IndexedCSVDataset(os.path.abspath(dataset_path))
+    else:
+        return {"error": f"Dataset file not found: {dataset_path}"}
+    
+    if dataset is None or dataset.empty:
+        return {"error": "Dataset is not loaded or is empty"}
+    
+    ensure_results_dir()
+    response_cache = get_response_cache() if use_cache else None
+    
+    if models:
+        from multi_model import EvaluatorModel, MultiModelEvaluator
+        try:
+            evaluator_models = [EvaluatorModel.from_spec(spec) for spec in models]
+            multi_evaluator = MultiModelEvaluator(evaluator_models, cache=response_cache)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"error": f"Invalid models: {e}"}
+        try:
+            directory, output_files = multi_model_outputs(evaluator_models, output_dir, resume, overwrite)
+        except ValueError as e:
+            return {"error": str(e)}
+        description = f"{dataset.path} with {', '.join(m.model for m in evaluator_models)}"
+        
+        async def run(job: EvaluationJob) -> dict:
+            try:
+                return await run_multi_model_evaluation(dataset, multi_evaluator, resume, job, incremental, directory)
+            finally:
+                await multi_evaluator.aclose()
+    else:
+        if resume and output_filename is None:
+            return {"error": "resume=True requires the output_filename of the run to resume"}
+        if output_filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_filename = f"evaluation_results_full_{len(dataset)}_{timestamp}.csv"
+        output_path = str(RESULTS_DIR / output_filename)
+        output_files = [output_path]
+        description = f"{dataset.path} with {WOLVERINE_SETTINGS.model}"
+        
+        async def run(job: EvaluationJob) -> dict:
+            if use_cache:
+                run_evaluator = get_job_evaluator()
+            else:
+                from clients import AsyncWolverineClient
+                from router import EndpointRouter
+                run_evaluator = AsyncStoryEvaluator(AsyncWolverineClient(router=EndpointRouter.from_settings(WOLVERINE_SETTINGS)))
+            if samples is not None and samples != run_evaluator.samples:
+                run_evaluator = AsyncStoryEvaluator(run_evaluator.client, samples=samples)
+            try:
+                return await run_dataset_evaluation(dataset, output_path, resume, run_evaluator, job, incremental)
+            finally:
+                # The uncached job evaluator's router belongs to this job only
+                if not use_cache:
+                    await run_evaluator.client.router.aclose()
+    
+    try:
+        job = job_manager.submit(description, len(dataset), output_files, run)
+    except ValueError as e:
+        return {"error": str(e)}
+    return job.to_dict()
+
+@mcp.tool()
+def get_job_status(job_id: str) -> dict:
+    """Return a background job's state, rows done, rows/sec, ETA, row errors and, once finished, its summary."""
+    print(f"[INFO] Tool called: get_job_status with job_id={job_id}")
+    job = job_manager.get(job_id)
+    if job is None:
+        return {"error": f"Unknown job: {job_id}"}
+    return job.to_dict()
+
+@mcp.tool()
+def cancel_job(job_id: str) -> dict:
+    """Cancel a queued or running background job. Rows already written stay in the output files, so it can be resumed later."""
+    print(f"[INFO] Tool called: cancel_job with job_id={job_id}")
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return {"error": f"Unknown job: {job_id}"}
+    return job.to_dict()
+
+@mcp.tool()
+def list_jobs() -> list[dict]:
+    """List every background job of this server session, oldest first."""
+    print("[INFO] Tool called: list_jobs")
+    return [job.to_dict() for job in job_manager.jobs()]
+
 if __name__ == "__main__":
     mcp.run()
\ No newline at end of file
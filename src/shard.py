@@ -0,0 +1,275 @@
+"""Split a dataset evaluation into index-range shards and merge their results deterministically.
+
+Each shard evaluates a contiguous range of dataset indices into its own CSV
+checkpoint, so shards can run as separate processes on one machine or on
+separate machines, each against its own vLLM endpoints. Usage:
+
+    # one shard (e.g. on machine 3 of 4), resumable with --resume
+    python src/shard.py run --shard 2 --num-shards 4 --out-dir dataset/results/shards/run1 --endpoints http://gpu3:8000/v1
+
+    # or every shard as a local process, spreading the endpoints over the shards
+    python src/shard.py launch --num-shards 4 --out-dir dataset/results/shards/run1 --endpoints http://gpu0:8000/v1 http://gpu1:8000/v1
+
+    # collect the shard CSVs into one result CSV ordered by index
+    python src/shard.py merge --out-dir dataset/results/shards/run1 --output dataset/results/run1.csv
+
+merge refuses to write the result when an index is missing or appears more
+than once, and names the shards to re-run.
+"""
+
+import argparse
+import asyncio
+import csv
+import re
+import subprocess
+import sys
+from pathlib import Path
+from config import DATASET_PATH, WOLVERINE_SETTINGS
+from dataset import IndexedCSVDataset
+from engine import (
+    RESULT_COLUMNS,
+    SAMPLED_RESULT_COLUMNS,
+    RowFailures,
+    evaluate_rows,
+    result_columns,
+    skip_failed_rows,
+    story_row_evaluator,
+)
+from results_writer import CheckpointWriter
+
+SHARD_FILENAME = "shard-{shard:04d}-of-{num_shards:04d}.csv"
+_SHARD_PATTERN = re.compile(r"shard-(\d+)-of-(\d+)\.csv$")
+
+
+def shard_range(total: int, shard: int, num_shards: int) -> tuple[int, int]:
+    """Half-open index range [start, end) of ``shard``; sizes differ by at most one row."""
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"Shard {shard} out of range for {num_shards} shards")
+    base, extra = divmod(total, num_shards)
+    start = shard * base + min(shard, extra)
+    return start, start + base + (1 if shard < extra else 0)
+
+
+def shard_path(out_dir: str | Path, shard: int, num_shards: int) -> Path:
+    return Path(out_dir) / SHARD_FILENAME.format(shard=shard, num_shards=num_shards)
+
+
+async def run_shard(
+    shard: int,
+    num_shards: int,
+    out_dir: str | Path,
+    dataset_path: str | Path = DATASET_PATH,
+    endpoints: list[str] | None = None,
+    model: str | None = None,
+    resume: bool = False,
+    use_cache: bool = True,
+) -> tuple[Path, RowFailures]:
+    """Evaluate the rows of one shard into its CSV checkpoint; return the file path and the rows that failed.
+
+    Failed rows are left out of the checkpoint, so ``resume=True`` evaluates them again.
+    """
+    # Imported here so `merge` does not load the HTTP clients
+    from cache import ResponseCache
+    from clients import AsyncWolverineClient
+    from evaluation import AsyncStoryEvaluator
+    from router import EndpointRouter, RouterSettings
+
+    s = WOLVERINE_SETTINGS
+    dataset = IndexedCSVDataset(str(dataset_path))
+    start, end = shard_range(len(dataset), shard, num_shards)
+    path = shard_path(out_dir, shard, num_shards)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    router = EndpointRouter(endpoints or list(s.endpoints) or [s.base_url], RouterSettings.from_settings(s))
+    cache = ResponseCache(s.cache_path, s.cache_max_entries) if use_cache and s.cache_enabled else None
+    client = AsyncWolverineClient(cache=cache, router=router, model=model)
+    evaluator = AsyncStoryEvaluator(client)
+    failures = RowFailures()
+
+    try:
+        with CheckpointWriter(str(path), result_columns(evaluator.samples), resume=resume) as writer:
+            skipped = len(writer.completed_indices)
+            print(f"[INFO] Shard {shard}/{num_shards}: rows {start}-{end - 1}, {skipped} already done")
+            rows = (
+                (i, row.get("model", ""), row.get("response", ""))
+                for i, row in _stop_at(dataset.iter_rows(start), end)
+                if i not in writer.completed_indices
+            )
+            evaluated = await evaluate_rows(
+                skip_failed_rows(story_row_evaluator(evaluator), failures),
+                rows,
+                max_active_rows=lambda: client.max_concurrency,
+                on_result=writer.write_row,
+            )
+    finally:
+        await router.aclose()
+    print(f"[INFO] Shard {shard}/{num_shards}: evaluated {evaluated} rows into {path}")
+    if failures.count:
+        print(f"[WARNING] Shard {shard}/{num_shards}: {failures.count} rows failed; re-run it with --resume")
+    return path, failures
+
+
+def _stop_at(rows, end: int):
+    # iter_rows yields in index order, so stop reading the dataset at the end of the shard
+    for index, row in rows:
+        if index >= end:
+            return
+        yield index, row
+
+
+def launch_shards(
+    num_shards: int,
+    out_dir: str | Path,
+    dataset_path: str | Path = DATASET_PATH,
+    endpoints: list[str] | None = None,
+    model: str | None = None,
+    resume: bool = False,
+    use_cache: bool = True,
+    shards: list[int] | None = None,
+) -> dict[int, int]:
+    """Run shards as local subprocesses (endpoints assigned round-robin) and return {shard: exit code}."""
+    processes = {}
+    for shard in shards if shards is not None else range(num_shards):
+        command = [
+            sys.executable, __file__, "run",
+            "--shard", str(shard), "--num-shards", str(num_shards),
+            "--out-dir", str(out_dir), "--dataset", str(dataset_path),
+        ]
+        if endpoints:
+            command += ["--endpoints", endpoints[shard % len(endpoints)]]
+        if model:
+            command += ["--model", model]
+        if resume:
+            command.append("--resume")
+        if not use_cache:
+            command.append("--no-cache")
+        processes[shard] = subprocess.Popen(command)
+    return_codes = {shard: process.wait() for shard, process in processes.items()}
+    failed = sorted(shard for shard, code in return_codes.items() if code != 0)
+    if failed:
+        print(f"[WARNING] Shards failed: {failed}; re-run them with `launch --resume --shards ...`")
+    return return_codes
+
+
+def merge_shards(out_dir: str | Path, output_path: str | Path, dataset_path: str | Path = DATASET_PATH) -> dict:
+    """Merge every shard CSV in ``out_dir`` into one CSV ordered by index.
+
+    Returns a report with the ``missing`` indices, ``duplicates`` (index ->
+    files containing it) and ``shards_to_rerun``: owners of missing rows plus
+    shard files holding rows outside their range. The merged file is only
+    written when every index appears exactly once.
+    """
+    total = len(IndexedCSVDataset(str(dataset_path)))
+    files = sorted(f for f in Path(out_dir).glob("shard-*-of-*.csv") if _SHARD_PATTERN.search(f.name))
+    shard_counts = {int(_SHARD_PATTERN.search(f.name).group(2)) for f in files}
+    if len(shard_counts) > 1:
+        raise ValueError(f"{out_dir} mixes shard files of different runs: num_shards {sorted(shard_counts)}")
+    num_shards = shard_counts.pop() if shard_counts else 0
+
+    columns = None
+    rows: dict[int, dict] = {}
+    seen: dict[int, list[str]] = {}
+    rerun: set[int] = set()
+    for f in files:
+        shard = int(_SHARD_PATTERN.search(f.name).group(1))
+        start, end = shard_range(total, shard, num_shards) if shard < num_shards else (0, 0)
+        with open(f, newline="", encoding="utf-8") as handle:
+            reader = csv.DictReader(handle)
+            if reader.fieldnames not in (RESULT_COLUMNS, SAMPLED_RESULT_COLUMNS):
+                raise ValueError(f"{f}: columns do not match the current result schema")
+            if columns is not None and reader.fieldnames != columns:
+                raise ValueError(f"{f}: columns differ from the other shard files")
+            columns = reader.fieldnames
+            for row in reader:
+                index = int(row["index"])
+                seen.setdefault(index, []).append(f.name)
+                rows[index] = row
+                # A row outside the shard's range, or repeated in it, means the shard file cannot be trusted
+                if not start <= index < end or seen[index].count(f.name) > 1:
+                    rerun.add(shard)
+
+    missing = [i for i in range(total) if i not in rows]
+    duplicates = {i: names for i, names in sorted(seen.items()) if len(names) > 1}
+    extra = sorted(i for i in rows if not 0 <= i < total)
+    # Without any shard file there is no shard layout, so missing rows have no owner to name
+    rerun.update(owner for owner in (_owner(i, total, num_shards) for i in missing) if owner is not None)
+    report = {
+        "total_entries": total,
+        "num_shards": num_shards,
+        "shard_files": len(files),
+        "rows": len(rows),
+        "missing": missing,
+        "duplicates": duplicates,
+        "out_of_range": extra,
+        "shards_to_rerun": sorted(rerun),
+        "output_file": None,
+    }
+    if missing or duplicates or extra:
+        print(
+            f"[WARNING] Not merging: {len(missing)} missing, {len(duplicates)} duplicate, "
+            f"{len(extra)} out-of-range indices; re-run shards {report['shards_to_rerun']}"
+        )
+        return report
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=columns or RESULT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for index in range(total):
+            writer.writerow(rows[index])
+    report["output_file"] = str(output_path)
+    print(f"[INFO] Merged {len(rows)} rows from {len(files)} shard files into {output_path}")
+    return report
+
+
+def _owner(index: int, total: int, num_shards: int) -> int | None:
+    # Shards are contiguous, so the owner is the last shard starting at or before the index
+    return next((k for k in reversed(range(num_shards)) if shard_range(total, k, num_shards)[0] <= index), None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sharded dataset evaluation with deterministic merge.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_arguments(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--num-shards", type=int, required=True)
+        p.add_argument("--out-dir", required=True, help="Directory holding the shard CSVs")
+        p.add_argument("--dataset", default=str(DATASET_PATH))
+        p.add_argument("--endpoints", nargs="+", default=None, help="vLLM base URLs (default: configured endpoints)")
+        p.add_argument("--model", default=None)
+        p.add_argument("--resume", action="store_true", help="Keep rows already in the shard CSVs")
+        p.add_argument("--no-cache", action="store_true", help="Do not read or write the response cache")
+
+    run_parser = subparsers.add_parser("run", help="Evaluate one shard in this process")
+    run_parser.add_argument("--shard", type=int, required=True, help="0-based shard number")
+    add_run_arguments(run_parser)
+
+    launch_parser = subparsers.add_parser("launch", help="Run shards as local subprocesses")
+    launch_parser.add_argument("--shards", type=int, nargs="+", default=None, help="Only these shards (default: all)")
+    add_run_arguments(launch_parser)
+
+    merge_parser = subparsers.add_parser("merge", help="Merge shard CSVs into one result CSV ordered by index")
+    merge_parser.add_argument("--out-dir", required=True)
+    merge_parser.add_argument("--output", required=True)
+    merge_parser.add_argument("--dataset", default=str(DATASET_PATH))
+
+    args = parser.parse_args()
+    if args.command == "run":
+        _, failures = asyncio.run(run_shard(
+            args.shard, args.num_shards, args.out_dir, args.dataset, args.endpoints, args.model, args.resume, not args.no_cache
+        ))
+        # A non-zero exit makes launch list the shard among those to re-run
+        sys.exit(1 if failures.count else 0)
+    elif args.command == "launch":
+        codes = launch_shards(
+            args.num_shards, args.out_dir, args.dataset, args.endpoints, args.model, args.resume, not args.no_cache, args.shards
+        )
+        sys.exit(1 if any(codes.values()) else 0)
+    else:
+        report = merge_shards(args.out_dir, args.output, args.dataset)
+        sys.exit(0 if report["output_file"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""Test setup: the modules in src/ and benchmarks/ import each other by bare name."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
@@ -0,0 +1,34 @@
+"""Offline batch runs driven through the stub backend in benchmarks/fake_openai.py (no server needed)."""
+
+import json
+
+import pytest
+
+from batch import BatchRun
+from fake_openai import FakeBackend
+from throughput import write_dataset
+
+
+def run_batch(backend: FakeBackend, input_path):
+    """Answer a round's input file the way vLLM's run_batch would."""
+    output_path = input_path.with_name(input_path.name.replace("_input", "_output"))
+    with open(input_path, encoding="utf-8") as inputs, open(output_path, "w", encoding="utf-8") as outputs:
+        for line in inputs:
+            request = json.loads(line)
+            status, body, _ = backend.reply(request["body"])
+            record = {"custom_id": request["custom_id"], "response": {"status_code": status, "body": body}, "error": None}
+            outputs.write(json.dumps(record) + "\n")
+    return output_path
+
+
+def test_ingest_rejects_output_of_another_round(tmp_path):
+    backend = FakeBackend("constant:0", seed=1)
+    write_dataset(tmp_path / "stories.csv", 4, 40)
+    run = BatchRun.create(tmp_path / "run", tmp_path / "stories.csv")
+    initial_output = run_batch(backend, run.export_initial())
+    BatchRun.load(tmp_path / "run").ingest(initial_output)
+    state = (tmp_path / "run" / "state.json").read_text()
+
+    with pytest.raises(ValueError, match="round 'contextual'"):
+        BatchRun.load(tmp_path / "run").ingest(initial_output)
+    assert (tmp_path / "run" / "state.json").read_text() == state
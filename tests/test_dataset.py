@@ -0,0 +1,18 @@
+"""IndexedCSVDataset header handling and random access."""
+
+from dataset import IndexedCSVDataset
+
+ROWS = 'model,response\nm1,"first story"\nm2,"second, with ""quotes""\nand a line break"\n'
+
+
+def test_header_with_bom_and_multiline_rows(tmp_path):
+    path = tmp_path / "stories.csv"
+    path.write_bytes("\ufeff".encode("utf-8") + ROWS.encode("utf-8"))
+    dataset = IndexedCSVDataset(str(path))
+
+    assert dataset.columns == ["model", "response"]
+    assert len(dataset) == 2
+    assert dataset[1] == {"model": "m2", "response": 'second, with "quotes"\nand a line break'}
+    assert [row["model"] for _, row in dataset.iter_rows()] == ["m1", "m2"]
+    # A second open reuses the stored offsets
+    assert IndexedCSVDataset(str(path))[0] == {"model": "m1", "response": "first story"}
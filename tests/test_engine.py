@@ -0,0 +1,79 @@
+"""evaluate_rows ordering, its row window following an adaptive concurrency limit, and incremental reuse."""
+
+import asyncio
+import threading
+
+from clients import AsyncWolverineClient
+from concurrency import ConcurrencyLimiter
+from engine import ResultStoreUsage, evaluate_rows, incremental_row_evaluator
+from evaluation import AsyncStoryEvaluator
+from fake_openai import FakeBackend, make_server
+from result_store import ResultStore
+from router import EndpointRouter, RouterSettings
+
+ROWS = [(i, "m", f"story {i}") for i in range(400)]
+
+
+def test_row_window_follows_growing_limit():
+    async def run() -> tuple[list[int], int, ConcurrencyLimiter]:
+        limiter = ConcurrencyLimiter(4, adaptive=True, window=10)
+        in_flight = peak = 0
+
+        async def request() -> None:
+            nonlocal in_flight, peak
+            async with limiter.slot():
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        async def evaluate_row(index: int, model: str, story: str) -> int:
+            # Like a story evaluation: two requests at once, then one depending on them
+            await asyncio.gather(request(), request())
+            await request()
+            return index
+
+        emitted = []
+        await evaluate_rows(evaluate_row, iter(ROWS), lambda: limiter.limit, emitted.append)
+        return emitted, peak, limiter
+
+    emitted, peak, limiter = asyncio.run(run())
+    assert emitted == [index for index, _, _ in ROWS]
+    # Sized once from the starting limit, in-flight requests would stay at or below 2 x 4
+    assert limiter.increases > 0 and peak > 2 * 4
+
+
+def test_unscored_rows_are_not_reused(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    rows = [(i, "m", f"Story number {i} about a lighthouse keeper.") for i in range(3)]
+
+    def run_against(backend: FakeBackend) -> tuple[list[dict], ResultStoreUsage]:
+        server = make_server(backend)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        router = EndpointRouter([f"http://127.0.0.1:{server.server_address[1]}/v1"], RouterSettings(max_retries=0))
+
+        async def run() -> tuple[list[dict], ResultStoreUsage]:
+            usage = ResultStoreUsage(store)
+            evaluator = AsyncStoryEvaluator(AsyncWolverineClient(router=router, adaptive_concurrency=False))
+            emitted = []
+            try:
+                await evaluate_rows(incremental_row_evaluator(evaluator, usage), iter(rows), 4, emitted.append)
+            finally:
+                await router.aclose()
+            return emitted, usage
+
+        try:
+            return asyncio.run(run())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    # Every reply is cut off, so the rows are written with unscored cells but not stored
+    emitted, usage = run_against(FakeBackend("constant:0", malformed_rate=1.0))
+    assert any(row["creativity_standalone_score"] is None for row in emitted)
+    assert usage.not_stored == len(rows) and store.stats()["entries"] == 0
+
+    healthy = FakeBackend("constant:0")
+    emitted, usage = run_against(healthy)
+    assert usage.reused == 0 and healthy.stats()["requests"] > 0
+    assert store.stats()["entries"] == len(rows)
@@ -0,0 +1,61 @@
+"""MultiModelEvaluator keeps each model's results when another model's endpoint is down."""
+
+import asyncio
+import csv
+import dataclasses
+import threading
+
+import multi_model
+from engine import RowFailures, evaluate_rows, result_columns, skip_failed_rows
+from fake_openai import FakeBackend, make_server
+from multi_model import EvaluatorModel, MultiModelEvaluator
+from results_writer import CheckpointWriter
+
+STORIES = [(i, "m", f"Story number {i} about a lighthouse keeper.") for i in range(4)]
+
+
+def test_dead_endpoint_fails_only_its_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(multi_model, "WOLVERINE_SETTINGS", dataclasses.replace(multi_model.WOLVERINE_SETTINGS, max_retries=0))
+    server = make_server(FakeBackend("constant:0"))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    dead = make_server(FakeBackend("constant:0"))
+    dead_url = f"http://127.0.0.1:{dead.server_address[1]}/v1"
+    dead.server_close()
+    models = [
+        EvaluatorModel("healthy", [f"http://127.0.0.1:{server.server_address[1]}/v1"]),
+        EvaluatorModel("down", [dead_url]),
+    ]
+    try:
+        async def run() -> tuple[dict[str, RowFailures], RowFailures]:
+            evaluator = MultiModelEvaluator(models)
+            model_failures = {m.model: RowFailures() for m in models}
+            failures = RowFailures()
+            columns = result_columns(evaluator.samples)
+            writers = {m.model: CheckpointWriter(str(tmp_path / m.result_filename), columns) for m in models}
+
+            def write_rows(model_rows: dict[str, dict]) -> None:
+                for name, row in model_rows.items():
+                    writers[name].write_row(row)
+
+            try:
+                await evaluate_rows(
+                    skip_failed_rows(evaluator.row_evaluator(writers, failures=model_failures), failures),
+                    iter(STORIES),
+                    max_active_rows=4,
+                    on_result=write_rows,
+                )
+            finally:
+                for writer in writers.values():
+                    writer.close()
+                await evaluator.aclose()
+            return model_failures, failures
+
+        model_failures, failures = asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with open(tmp_path / "healthy_result.csv", newline="", encoding="utf-8") as f:
+        assert [int(row["index"]) for row in csv.DictReader(f)] == [0, 1, 2, 3]
+    assert model_failures["down"].count == len(STORIES) and model_failures["healthy"].count == 0
+    assert failures.count == 0
@@ -0,0 +1,12 @@
+"""Reply parsers against the corpus of real-world replies in benchmarks/parsing_corpus.jsonl."""
+
+import pytest
+
+from parse_scores import PARSERS, load_corpus
+
+CORPUS = load_corpus()
+
+
+@pytest.mark.parametrize("entry", CORPUS, ids=[f"{entry['kind']}: {entry['note']}" for entry in CORPUS])
+def test_corpus_reply(entry):
+    assert PARSERS[entry["kind"]](entry["response"]) == entry["expected"]
@@ -0,0 +1,12 @@
+"""ResultStore keys separate results produced under different settings."""
+
+from result_store import ResultStore
+
+SETTINGS = {"story": "A story.", "evaluator_model": "m", "prompt_version": "2", "temperature": 0.7, "structured_output": False}
+
+
+def test_key_covers_temperature_and_structured_output():
+    key = ResultStore.make_key(**SETTINGS)
+    assert ResultStore.make_key(**SETTINGS) == key
+    assert ResultStore.make_key(**{**SETTINGS, "temperature": 0.0}) != key
+    assert ResultStore.make_key(**{**SETTINGS, "structured_output": True}) != key
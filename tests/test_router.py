@@ -0,0 +1,123 @@
+"""EndpointRouter retries, failover and recovery against the stub server in benchmarks/fake_openai.py."""
+
+import asyncio
+import threading
+import time
+
+import openai
+import pytest
+
+from concurrency import ConcurrencyLimiter
+from fake_openai import FakeBackend, make_server
+from router import EndpointRouter, RouterSettings
+
+REQUEST = {
+    "model": "fake",
+    "messages": [{"role": "user", "content": "Return a JSON object with a 'score' key."}],
+}
+
+
+def start_server(backend: FakeBackend, port: int = 0):
+    server = make_server(backend, port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server) -> None:
+    server.shutdown()
+    server.server_close()
+
+
+def base_url(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+@pytest.fixture
+def settings():
+    return RouterSettings(
+        connect_timeout=1.0, request_timeout=5.0, max_retries=3, retry_backoff=0.01,
+        unhealthy_after_failures=2, health_check_interval=0.3,
+    )
+
+
+def test_retries_transient_errors_then_gives_up(settings):
+    backend = FakeBackend("constant:0", error_rate=1.0)
+    server = start_server(backend)
+    router = EndpointRouter([base_url(server)], settings)
+    try:
+        with pytest.raises(openai.InternalServerError):
+            router.create(**REQUEST)
+        assert backend.stats()["requests"] == settings.max_retries + 1
+    finally:
+        router.close()
+        stop_server(server)
+
+
+def test_fails_over_and_readmits_endpoint_after_health_check(settings):
+    backends = [FakeBackend("constant:0"), FakeBackend("constant:0")]
+    servers = [start_server(backend) for backend in backends]
+    router = EndpointRouter([base_url(server) for server in servers], settings)
+    dead_port = servers[0].server_address[1]
+    try:
+        stop_server(servers[0])
+        # Every request still succeeds: refused connections are retried on the other replica
+        for _ in range(6):
+            assert router.create(**REQUEST).choices[0].message.content
+        status = router.status()
+        assert not status[0]["healthy"] and status[0]["failures"] == settings.unhealthy_after_failures
+        assert status[1]["healthy"] and backends[1].stats()["requests"] == 6
+
+        # Unhealthy endpoints get no traffic until a health check succeeds
+        servers[0] = start_server(backends[0], port=dead_port)
+        router.create(**REQUEST)
+        assert backends[0].stats()["requests"] == 0 and not router.status()[0]["healthy"]
+
+        time.sleep(settings.health_check_interval)
+        for _ in range(4):
+            router.create(**REQUEST)
+        assert router.status()[0]["healthy"]
+        assert backends[0].stats()["requests"] > 0
+    finally:
+        router.close()
+        for server in servers:
+            stop_server(server)
+
+
+def test_async_client_fails_over(settings):
+    backend = FakeBackend("constant:0")
+    live = start_server(backend)
+    dead = start_server(FakeBackend("constant:0"))
+    router = EndpointRouter([base_url(dead), base_url(live)], settings)
+    stop_server(dead)
+    try:
+        async def send(count: int) -> list:
+            try:
+                return [await router.acreate(**REQUEST) for _ in range(count)]
+            finally:
+                await router.aclose()
+
+        assert all(completion.choices for completion in asyncio.run(send(4)))
+        assert not router.status()[0]["healthy"]
+        assert backend.stats()["requests"] == 4
+        assert all(endpoint.async_client.is_closed() for endpoint in router.endpoints)
+    finally:
+        stop_server(live)
+
+
+def test_limiter_sees_every_retried_failure(settings):
+    backend = FakeBackend("constant:0", error_rate=1.0)
+    server = start_server(backend)
+    router = EndpointRouter([base_url(server)], settings)
+    try:
+        async def send() -> ConcurrencyLimiter:
+            limiter = ConcurrencyLimiter(4, adaptive=True, window=2)
+            async with limiter.slot():
+                with pytest.raises(openai.InternalServerError):
+                    await router.acreate(on_error=limiter.record_error, **REQUEST)
+            await router.aclose()
+            return limiter
+
+        limiter = asyncio.run(send())
+        assert limiter.overload_errors == settings.max_retries + 1
+    finally:
+        stop_server(server)
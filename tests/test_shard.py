@@ -0,0 +1,53 @@
+"""merge_shards reports on incomplete shard directories instead of writing a partial result."""
+
+import csv
+
+from engine import RESULT_COLUMNS
+from shard import merge_shards, shard_path, shard_range
+
+TOTAL = 10
+
+
+def write_dataset(path) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["model", "response"])
+        writer.writerows([f"m{i}", f"story {i}"] for i in range(TOTAL))
+
+
+def write_shard(out_dir, shard: int, num_shards: int, indices) -> None:
+    with open(shard_path(out_dir, shard, num_shards), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, restval="")
+        writer.writeheader()
+        writer.writerows({"index": i, "model": f"m{i}"} for i in indices)
+
+
+def test_empty_out_dir_reports_every_index_missing(tmp_path):
+    write_dataset(tmp_path / "stories.csv")
+    (tmp_path / "shards").mkdir()
+    report = merge_shards(tmp_path / "shards", tmp_path / "merged.csv", tmp_path / "stories.csv")
+
+    assert report["missing"] == list(range(TOTAL))
+    assert report["num_shards"] == 0 and report["shards_to_rerun"] == []
+    assert report["output_file"] is None and not (tmp_path / "merged.csv").exists()
+
+
+def test_partial_shards_name_the_shards_to_rerun(tmp_path):
+    write_dataset(tmp_path / "stories.csv")
+    out_dir = tmp_path / "shards"
+    out_dir.mkdir()
+    # Shard 0 complete, shard 1 stopped half way, shard 2 never started
+    write_shard(out_dir, 0, 3, range(*shard_range(TOTAL, 0, 3)))
+    start, end = shard_range(TOTAL, 1, 3)
+    write_shard(out_dir, 1, 3, range(start, start + 1))
+    report = merge_shards(out_dir, tmp_path / "merged.csv", tmp_path / "stories.csv")
+
+    assert report["missing"] == list(range(start + 1, TOTAL))
+    assert report["shards_to_rerun"] == [1, 2]
+    assert report["output_file"] is None and not (tmp_path / "merged.csv").exists()
+
+    write_shard(out_dir, 1, 3, range(start, end))
+    write_shard(out_dir, 2, 3, range(*shard_range(TOTAL, 2, 3)))
+    report = merge_shards(out_dir, tmp_path / "merged.csv", tmp_path / "stories.csv")
+    with open(tmp_path / "merged.csv", newline="", encoding="utf-8") as f:
+        assert [int(row["index"]) for row in csv.DictReader(f)] == list(range(TOTAL))